@@ -0,0 +1 @@
+"""계획 파이프라인 성능 벤치마크 (python -m benchmarks.run)"""
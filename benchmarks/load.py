@@ -0,0 +1,469 @@
+"""
+동시 세션 부하 테스트.
+
+실제 app.py를 헤드리스 Streamlit 서버로 띄우고(Gemini는 benchmarks.stub 스텁으로 대체),
+브라우저와 같은 웹소켓 프로토콜로 여러 세션을 동시에 흉내 냅니다. 세션마다 첫 화면 로드,
+폼 제출, 그래프 전환(프래그먼트 재실행), CSV/PNG 다운로드를 수행하고, 동시 세션 수
+단계별로 스크립트 실행 지연 p50/p95/p99, 처리량, 서버 RSS 증가량을 보고합니다.
+다운로드가 한 번이라도 실패하면 종료 코드 1을 반환합니다.
+처리량이 더 이상 늘지 않거나 p95가 목표(--slo)를 넘는 첫 단계를 포화 지점으로 표시합니다.
+
+사용 예:
+    python -m benchmarks.load                          # 동시 1/2/4/8/16/32 세션
+    python -m benchmarks.load --levels 1,4,16 --gemini-latency 1.5 -o load.json
+
+AppTest는 실행마다 전역 Runtime을 바꾸므로 한 프로세스에서 세션을 동시에 돌릴 수 없어
+실제 서버를 사용합니다. RSS는 Linux의 /proc에서 읽으며, 다른 OS에서는 비어 있습니다.
+웹소켓 클라이언트가 필요합니다: pip install -r benchmarks/requirements.txt
+"""
+
+import argparse
+import asyncio
+import importlib.util
+import json
+import os
+import random
+import socket
+import subprocess
+import sys
+import tempfile
+import time
+import urllib.request
+
+APP_PATH = os.path.join(os.path.dirname(os.path.dirname(__file__)), "app.py")
+DEFAULT_LEVELS = (1, 2, 4, 8, 16, 32)
+ACTIONS = ("load", "submit", "toggle", "prepare", "download")
+SCRIPT_RUN_ACTIONS = ACTIONS[:4]
+DOWNLOADS = ("📥 CSV 파일로 다운로드", "📸 이미지로 저장")
+PREPARE_SUFFIX = " 준비"  # app.py의 PREPARED_EXPORT_FORMATS 버튼 라벨
+
+# 폼/위젯 라벨 (app.py와 같아야 함)
+GOAL_LABEL = "훈련 목표 이름"
+DESCRIPTION_LABEL = "훈련 목표 계획을 설명해 주세요"
+SUBMIT_LABEL = "다 음"
+CHART_LABEL = "그래프 선택"
+
+
+def serve(port, gemini_latency):
+    """스텁 Gemini로 app.py를 실행하는 서버 프로세스 본체 (--serve)"""
+    import google.generativeai as genai
+
+    from benchmarks.stub import StubModel
+
+    genai.GenerativeModel = lambda *args, **kwargs: StubModel(gemini_latency)
+    from streamlit.web import cli
+
+    sys.argv = [
+        "streamlit",
+        "run",
+        APP_PATH,
+        "--server.headless=true",
+        f"--server.port={port}",
+        "--server.address=127.0.0.1",
+        "--server.fileWatcherType=none",
+        "--browser.gatherUsageStats=false",
+        "--logger.level=error",
+    ]
+    cli.main()
+
+
+def _free_port():
+    with socket.socket() as sock:
+        sock.bind(("127.0.0.1", 0))
+        return sock.getsockname()[1]
+
+
+def start_server(port, gemini_latency, cache_dir):
+    env = dict(os.environ)
+    env["GEMINI_API_KEY"] = "stub"
+    env["PLANNER_CACHE_DIR"] = cache_dir
+    # 스텁 호출이 요청 제한에 막혀 지연 측정이 왜곡되지 않도록 기본값을 크게 (직접 지정 시 우선)
+    env.setdefault("PLANNER_GEMINI_RPM", "1000000")
+    env.setdefault("PLANNER_GEMINI_TPM", "1000000000")
+    process = subprocess.Popen(
+        [
+            sys.executable,
+            "-W",
+            "ignore::FutureWarning",
+            "-m",
+            "benchmarks.load",
+            "--serve",
+            "--port",
+            str(port),
+            "--gemini-latency",
+            str(gemini_latency),
+        ],
+        env=env,
+        stdout=subprocess.DEVNULL,
+    )
+    deadline = time.monotonic() + 60
+    while time.monotonic() < deadline:
+        if process.poll() is not None:
+            raise RuntimeError("Streamlit 서버가 시작되지 않았습니다.")
+        try:
+            with urllib.request.urlopen(
+                f"http://127.0.0.1:{port}/_stcore/health", timeout=1
+            ):
+                return process
+        except OSError:
+            time.sleep(0.2)
+    process.kill()
+    raise RuntimeError("Streamlit 서버 응답 대기 시간이 초과되었습니다.")
+
+
+def rss_bytes(pid):
+    """프로세스 RSS (Linux /proc, 그 외에는 None)"""
+    try:
+        with open(f"/proc/{pid}/status") as f:
+            for line in f:
+                if line.startswith("VmRSS:"):
+                    return int(line.split()[1]) * 1024
+    except OSError:
+        pass
+    return None
+
+
+def description_for(index, rng, gemini_share):
+    """세션별 훈련 설명. gemini_share 비율은 문맥 표현을 넣어 Gemini(스텁) 경로로 보냄"""
+    from performanceplan.lexicon import TRAINING_LEXICON
+
+    names = [synonyms[0] for _, _, synonyms in rng.sample(TRAINING_LEXICON, 3)]
+    text = ", ".join(names)
+    if rng.random() < gemini_share:
+        # 설명마다 달라 분석 캐시를 거치지 않음
+        return f"무릎 통증이 있어 점프 없이 {text} 위주로 (세션 {index})"
+    return text
+
+
+class Session:
+    """웹소켓 하나로 연결된 브라우저 세션"""
+
+    def __init__(self, base_url, timeout):
+        self.base_url = base_url
+        self.timeout = timeout
+        self.widgets = {}  # 라벨 -> (위젯 proto, 프래그먼트 id)
+        self.states = {}  # 위젯 id -> 유지되는 WidgetState
+        self.errors = 0
+        self.download_errors = 0
+        self._ws = None
+
+    async def __aenter__(self):
+        import websockets
+
+        url = self.base_url.replace("http", "ws", 1) + "/_stcore/stream"
+        self._ws = await websockets.connect(
+            url, subprotocols=["streamlit"], max_size=None
+        )
+        return self
+
+    async def __aexit__(self, *exc):
+        await self._ws.close()
+
+    async def _receive(self):
+        from streamlit.proto.ForwardMsg_pb2 import ForwardMsg
+
+        msg = ForwardMsg()
+        msg.ParseFromString(await asyncio.wait_for(self._ws.recv(), self.timeout))
+        return msg
+
+    def _collect(self, msg):
+        from streamlit.proto.Alert_pb2 import Alert
+
+        delta = msg.delta
+        if delta.WhichOneof("type") != "new_element":
+            return
+        kind = delta.new_element.WhichOneof("type")
+        element = getattr(delta.new_element, kind)
+        if kind == "alert" and element.format == Alert.ERROR:
+            self.errors += 1
+        if getattr(element, "id", "") and hasattr(element, "label"):
+            self.widgets[element.label] = (element, delta.fragment_id)
+
+    async def rerun(self, triggers=(), fragment_id=""):
+        """스크립트(또는 프래그먼트)를 다시 실행하고 완료까지 걸린 시간(초)"""
+        from streamlit.proto.BackMsg_pb2 import BackMsg
+        from streamlit.proto.ForwardMsg_pb2 import ForwardMsg
+
+        back = BackMsg()
+        back.rerun_script.query_string = ""
+        back.rerun_script.widget_states.widgets.extend(
+            [*self.states.values(), *triggers]
+        )
+        if fragment_id:
+            back.rerun_script.fragment_id = fragment_id
+        started = time.perf_counter()
+        await self._ws.send(back.SerializeToString())
+        while True:
+            msg = await self._receive()
+            kind = msg.WhichOneof("type")
+            if kind == "delta":
+                self._collect(msg)
+            elif (
+                kind == "script_finished"
+                # st.rerun()으로 이어지는 실행은 다음 실행이 끝날 때까지 기다림
+                and msg.script_finished != ForwardMsg.FINISHED_EARLY_FOR_RERUN
+            ):
+                return time.perf_counter() - started
+
+    def set_value(self, label, **value):
+        from streamlit.proto.WidgetStates_pb2 import WidgetState
+
+        element, _ = self.widgets[label]
+        self.states[element.id] = WidgetState(id=element.id, **value)
+
+    def trigger(self, label):
+        from streamlit.proto.WidgetStates_pb2 import WidgetState
+
+        element, fragment_id = self.widgets[label]
+        return WidgetState(id=element.id, trigger_value=True), fragment_id
+
+    async def download(self, label):
+        """다운로드 버튼의 미디어 파일을 받기까지 걸린 시간(초)"""
+        element, _ = self.widgets[label]
+        if not element.url:
+            raise RuntimeError(f"다운로드 파일이 없습니다: {label}")
+        started = time.perf_counter()
+        await asyncio.to_thread(_fetch, self.base_url + element.url, self.timeout)
+        return time.perf_counter() - started
+
+
+def _fetch(url, timeout):
+    with urllib.request.urlopen(url, timeout=timeout) as response:
+        return len(response.read())
+
+
+async def user_flow(base_url, description, timeout, record):
+    """
+    첫 로드 -> 폼 제출 -> 그래프 전환 -> (준비 ->) 다운로드. record(action, 초)로 기록하고
+    (앱 오류 표시 수, 다운로드 실패 수)를 반환
+    """
+    async with Session(base_url, timeout) as session:
+        record("load", await session.rerun())
+        session.set_value(GOAL_LABEL, string_value="마라톤")
+        session.set_value(DESCRIPTION_LABEL, string_value=description)
+        submit, _ = session.trigger(SUBMIT_LABEL)
+        record("submit", await session.rerun([submit]))
+        if CHART_LABEL not in session.widgets:
+            raise RuntimeError("폼 제출 후 계획이 표시되지 않았습니다.")
+        radio, fragment_id = session.widgets[CHART_LABEL]
+        session.set_value(CHART_LABEL, string_value=radio.options[1])
+        record("toggle", await session.rerun(fragment_id=fragment_id))
+        for label in DOWNLOADS:
+            if (
+                label not in session.widgets
+                and label + PREPARE_SUFFIX in session.widgets
+            ):
+                # 만들기 비싼 형식은 '준비' 버튼(프래그먼트 재실행)으로 먼저 파일을 만듦
+                prepare, fragment_id = session.trigger(label + PREPARE_SUFFIX)
+                record("prepare", await session.rerun([prepare], fragment_id))
+            try:
+                record("download", await session.download(label))
+            except (KeyError, RuntimeError, OSError):
+                session.download_errors += 1
+        return session.errors, session.download_errors
+
+
+def percentiles(values):
+    import numpy as np
+
+    if not values:
+        return {"p50": None, "p95": None, "p99": None}
+    p50, p95, p99 = np.percentile(values, [50, 95, 99])
+    return {"p50": float(p50), "p95": float(p95), "p99": float(p99)}
+
+
+async def run_level(base_url, concurrency, sessions, args, rng, offset):
+    """concurrency개 작업자가 각각 sessions번 사용자 흐름을 반복"""
+    latencies = {action: [] for action in ACTIONS}
+    failures, app_errors, download_errors = [], 0, 0
+
+    def record(action, seconds):
+        latencies[action].append(seconds)
+
+    async def worker(worker_index):
+        nonlocal app_errors, download_errors
+        for i in range(sessions):
+            index = offset + worker_index * sessions + i
+            description = description_for(index, rng, args.gemini_share)
+            try:
+                errors, downloads = await user_flow(
+                    base_url, description, args.timeout, record
+                )
+                app_errors += errors
+                download_errors += downloads
+            except Exception as exc:  # noqa: BLE001 - 실패도 결과로 보고
+                failures.append(f"{type(exc).__name__}: {exc}")
+
+    started = time.perf_counter()
+    await asyncio.gather(*(worker(w) for w in range(concurrency)))
+    elapsed = time.perf_counter() - started
+    script_runs = [s for action in SCRIPT_RUN_ACTIONS for s in latencies[action]]
+    return {
+        "concurrency": concurrency,
+        "sessions": concurrency * sessions,
+        "seconds": elapsed,
+        "script_runs_per_second": len(script_runs) / elapsed,
+        "sessions_per_second": (concurrency * sessions - len(failures)) / elapsed,
+        "script_run": percentiles(script_runs),
+        "actions": {action: percentiles(latencies[action]) for action in ACTIONS},
+        "failures": len(failures),
+        "failure_samples": failures[:3],
+        "app_errors": app_errors,
+        "download_errors": download_errors,
+    }
+
+
+def find_saturation(levels, slo):
+    """
+    실패(세션 실패, 앱 오류, 다운로드 실패)가 생기거나, script run p95가 slo를 넘거나,
+    처리량 증가가 10% 미만인 첫 단계
+    """
+    best = 0.0
+    for level in levels:
+        p95 = level["script_run"]["p95"]
+        failed = level["failures"] or level["app_errors"] or level["download_errors"]
+        if failed or (p95 is not None and p95 > slo):
+            reason = "실패 발생" if failed else f"p95 > {slo}s"
+            return {"concurrency": level["concurrency"], "reason": reason}
+        throughput = level["script_runs_per_second"]
+        if best and throughput < best * 1.1:
+            return {"concurrency": level["concurrency"], "reason": "처리량 정체"}
+        best = max(best, throughput)
+    return None
+
+
+def _ms(seconds):
+    return "-" if seconds is None else f"{seconds * 1000:.0f}ms"
+
+
+def _format_level(level):
+    run = level["script_run"]
+    rss = level.get("rss_per_session")
+    return (
+        f"동시 {level['concurrency']:>3}  세션 {level['sessions']:>4}"
+        f"  p50 {_ms(run['p50']):>7}  p95 {_ms(run['p95']):>7}"
+        f"  p99 {_ms(run['p99']):>7}"
+        f"  {level['script_runs_per_second']:6.1f} runs/s"
+        f"  RSS/세션 {'-' if rss is None else f'{rss / 1024 / 1024:.1f}MiB'}"
+        f"  실패 {level['failures']}"
+        f"  다운로드 실패 {level['download_errors']}"
+    )
+
+
+async def run_load(base_url, server_pid, args):
+    rng = random.Random(args.seed)
+    # 첫 실행의 import/캐시 워밍업은 측정에서 제외
+    await user_flow(
+        base_url, description_for(-1, rng, 0.0), args.timeout, lambda *_: None
+    )
+    levels, offset = [], 0
+    for concurrency in args.levels:
+        rss_before = rss_bytes(server_pid)
+        level = await run_level(base_url, concurrency, args.sessions, args, rng, offset)
+        offset += level["sessions"]
+        rss_after = rss_bytes(server_pid)
+        level["rss_before"], level["rss_after"] = rss_before, rss_after
+        level["rss_per_session"] = (
+            None
+            if rss_before is None or rss_after is None
+            else (rss_after - rss_before) / level["sessions"]
+        )
+        levels.append(level)
+        print(_format_level(level), flush=True)
+    return levels
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(
+        prog="python -m benchmarks.load",
+        description="동시 세션 부하 테스트 (헤드리스 서버 + Gemini 스텁)",
+    )
+    parser.add_argument(
+        "--levels",
+        type=lambda text: [int(v) for v in text.split(",")],
+        default=list(DEFAULT_LEVELS),
+        help="쉼표로 구분한 동시 세션 수 단계",
+    )
+    parser.add_argument(
+        "--sessions", type=int, default=3, help="단계마다 작업자 한 명이 반복할 세션 수"
+    )
+    parser.add_argument(
+        "--gemini-latency", type=float, default=1.0, help="스텁 Gemini 호출 지연(초)"
+    )
+    parser.add_argument(
+        "--gemini-share",
+        type=float,
+        default=0.2,
+        help="로컬 분류 대신 Gemini(스텁)로 가는 설명의 비율",
+    )
+    parser.add_argument(
+        "--slo", type=float, default=2.0, help="포화 판정 script run p95 목표(초)"
+    )
+    parser.add_argument("--timeout", type=float, default=120.0)
+    parser.add_argument("--seed", type=int, default=0)
+    parser.add_argument(
+        "--url", help="이미 실행 중인 서버 주소 (지정 시 서버를 띄우지 않음)"
+    )
+    parser.add_argument("--pid", type=int, help="--url 서버의 프로세스 id (RSS 측정용)")
+    parser.add_argument("-o", "--output", help="결과 JSON 파일")
+    parser.add_argument("--serve", action="store_true", help=argparse.SUPPRESS)
+    parser.add_argument("--port", type=int, default=0, help=argparse.SUPPRESS)
+    args = parser.parse_args(argv)
+
+    if args.serve:
+        serve(args.port, args.gemini_latency)
+        return 0
+    if importlib.util.find_spec("websockets") is None:
+        parser.error(
+            "websockets가 필요합니다: pip install -r benchmarks/requirements.txt"
+        )
+
+    process = None
+    with tempfile.TemporaryDirectory(prefix="planner-load-") as cache_dir:
+        if args.url:
+            base_url, server_pid = args.url.rstrip("/"), args.pid
+        else:
+            port = _free_port()
+            process = start_server(port, args.gemini_latency, cache_dir)
+            base_url, server_pid = f"http://127.0.0.1:{port}", process.pid
+        try:
+            levels = asyncio.run(run_load(base_url, server_pid, args))
+        finally:
+            if process is not None:
+                process.terminate()
+                process.wait(timeout=30)
+
+    saturation = find_saturation(levels, args.slo)
+    if saturation is None:
+        print("포화 지점: 측정한 단계 안에서 포화되지 않음")
+    else:
+        print(
+            f"포화 지점: 동시 {saturation['concurrency']} 세션 ({saturation['reason']})"
+        )
+    if args.output:
+        report = {
+            "config": {
+                key: getattr(args, key)
+                for key in (
+                    "levels",
+                    "sessions",
+                    "gemini_latency",
+                    "gemini_share",
+                    "slo",
+                )
+            },
+            "levels": levels,
+            "saturation": saturation,
+        }
+        with open(args.output, "w", encoding="utf-8") as f:
+            json.dump(report, f, ensure_ascii=False, indent=2)
+    download_errors = sum(level["download_errors"] for level in levels)
+    if download_errors:
+        # 다운로드는 부하와 관계없이 모두 성공해야 함
+        print(f"다운로드 실패 {download_errors}건", file=sys.stderr)
+        return 1
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
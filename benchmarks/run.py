@@ -0,0 +1,295 @@
+"""
+계획 파이프라인 벤치마크.
+
+훈련 분류, 가이드 조회, 계획 생성, 그래프, 캘린더, CSV 내보내기를 계획 기간
+(7/21/90/365일)별로, 분석부터 CSV까지의 전체 경로를 배치 크기(1/100/1000건)별로 측정합니다.
+Gemini는 결정적 로컬 스텁(benchmarks.stub)으로 대체하므로 오프라인에서 실행됩니다.
+
+사용 예:
+    python -m benchmarks.run --save-baseline          # 현재 결과를 기준선으로 저장
+    python -m benchmarks.run                          # 기준선과 비교 (회귀 시 종료 코드 1)
+    python -m benchmarks.run --quick -k calendar      # 일부만 빠르게 측정
+
+전체 실행은 1000건 배치 때문에 수 분이 걸립니다. 기준선은 측정한 기기에서만 의미가 있으므로
+같은 환경에서 저장하고 비교하세요.
+
+결과는 케이스별 실행 시간 중앙값/최소값(초)과 tracemalloc 기준 최대 메모리(바이트)입니다.
+"""
+
+import argparse
+import json
+import os
+import platform
+import random
+import re
+import statistics
+import sys
+import time
+import tracemalloc
+from concurrent.futures import ThreadPoolExecutor
+from datetime import date, timedelta
+
+HORIZONS = (7, 21, 90, 365)
+BATCH_SIZES = (1, 100, 1000)
+QUICK_HORIZONS = (7, 21)
+QUICK_BATCH_SIZES = (1, 100)
+
+DEFAULT_BASELINE = os.path.join(os.path.dirname(__file__), "baseline.json")
+START_DAY = date(2025, 1, 1)
+DESCRIPTION = "주 4회 훈련합니다. 인터벌, 지속주, 회복 조깅을 포함하고 싶습니다."
+
+
+def measure(fn, repeats):
+    """fn을 repeats번 실행한 시간 통계와, 한 번 더 실행한 tracemalloc 최대 메모리"""
+    if repeats > 1:
+        fn()  # 지연 import와 메모 초기화를 측정에서 제외
+    samples = []
+    for _ in range(repeats):
+        started = time.perf_counter()
+        fn()
+        samples.append(time.perf_counter() - started)
+    tracemalloc.start()
+    try:
+        fn()
+        peak = tracemalloc.get_traced_memory()[1]
+    finally:
+        tracemalloc.stop()
+    return {
+        "seconds": statistics.median(samples),
+        "min_seconds": min(samples),
+        "repeats": repeats,
+        "peak_bytes": peak,
+    }
+
+
+def _counter():
+    value = [0]
+
+    def next_value():
+        value[0] += 1
+        return value[0]
+
+    return next_value
+
+
+def plan_cases(horizons, service):
+    """계획 기간별 단계 케이스 (이름, 함수)"""
+    import numpy as np
+    import pandas as pd
+
+    from performanceplan.charts import create_intensity_chart, create_performance_chart
+    from performanceplan.planner import (
+        LEVEL_LABELS,
+        add_performance_levels,
+        generate_dynamic_plan,
+        get_detailed_guide,
+        get_intuitive_df_for_csv,
+        get_trainings_by_level,
+        plan_ensemble,
+    )
+    from performanceplan.render import generate_calendar_html
+
+    training_list = service.analyze(DESCRIPTION, "마라톤")
+    yield "trainings_by_level", lambda: get_trainings_by_level(training_list)
+
+    trainings = get_trainings_by_level(training_list)
+    for days in horizons:
+        date_range = pd.date_range(START_DAY, periods=days)
+        df = add_performance_levels(
+            generate_dynamic_plan(days, date_range, trainings, rng=random.Random(0))
+        )
+        names = df["훈련 내용"].tolist()
+        band = plan_ensemble(days, 1000, rng=np.random.default_rng(0))
+
+        def guides(names=names):
+            rng = random.Random(0)
+            return [get_detailed_guide(name, rng) for name in names]
+
+        yield f"detailed_guide/{days}d", guides
+        yield f"dynamic_plan/{days}d", lambda days=days, date_range=date_range: (
+            generate_dynamic_plan(days, date_range, trainings, rng=random.Random(0))
+        )
+        # 그래프는 Streamlit이 보내는 것과 같은 JSON 직렬화까지 포함
+        yield f"performance_chart/{days}d", lambda df=df, band=band: (
+            create_performance_chart(df, band).to_json()
+        )
+        yield f"intensity_chart/{days}d", lambda df=df: (
+            create_intensity_chart(df, LEVEL_LABELS).to_json()
+        )
+        yield f"calendar_html/{days}d", lambda df=df: generate_calendar_html(
+            df, LEVEL_LABELS
+        )
+        yield f"csv_export/{days}d", lambda df=df: (
+            get_intuitive_df_for_csv(df, LEVEL_LABELS)
+            .to_csv(index=False)
+            .encode("utf-8-sig")
+        )
+
+
+def batch_cases(horizons, batch_sizes, service, workers):
+    """분석(스텁) -> 계획 생성 -> CSV 내보내기 전체 경로를 n건 처리하는 케이스"""
+    from performanceplan.planner import (
+        LEVEL_LABELS,
+        generate_compact_plan,
+        get_intuitive_df_for_csv,
+        get_trainings_by_level,
+        plan_frame,
+    )
+
+    def run(days, n, seeds):
+        # 매 실행마다 새 시드/설명을 사용하여 계획 메모와 분석 결과 재사용을 피함
+        base = seeds() * n
+        end_day = START_DAY + timedelta(days=days - 1)
+        descriptions = [f"{DESCRIPTION} #{base + i}" for i in range(n)]
+        with ThreadPoolExecutor(workers) as pool:
+            analyses = list(
+                pool.map(lambda text: service.analyze(text, "마라톤"), descriptions)
+            )
+        for i, training_list in enumerate(analyses):
+            plan = generate_compact_plan(
+                START_DAY,
+                end_day,
+                get_trainings_by_level(training_list),
+                seed=base + i,
+            )
+            get_intuitive_df_for_csv(plan_frame(plan), LEVEL_LABELS).to_csv(
+                index=False
+            ).encode("utf-8-sig")
+
+    for days in horizons:
+        for n in batch_sizes:
+            seeds = _counter()
+            yield f"batch/{days}d/{n}", lambda days=days, n=n, seeds=seeds: run(
+                days, n, seeds
+            )
+
+
+def environment():
+    import numpy
+    import pandas
+
+    return {
+        "python": platform.python_version(),
+        "platform": platform.platform(),
+        "processor": platform.processor() or platform.machine(),
+        "numpy": numpy.__version__,
+        "pandas": pandas.__version__,
+        "timestamp": time.strftime("%Y-%m-%dT%H:%M:%S%z"),
+    }
+
+
+def compare(results, baseline, threshold, memory_threshold, min_delta):
+    """기준선 대비 시간/메모리가 임계 비율을 넘게 늘어난 케이스 목록"""
+    regressions = []
+    for name, current in results.items():
+        previous = baseline.get(name)
+        if previous is None:
+            continue
+        slower = current["seconds"] - previous["seconds"]
+        if slower > min_delta and current["seconds"] > previous["seconds"] * (
+            1 + threshold
+        ):
+            regressions.append(
+                (name, "seconds", previous["seconds"], current["seconds"])
+            )
+        if current["peak_bytes"] > previous["peak_bytes"] * (1 + memory_threshold):
+            regressions.append(
+                (name, "peak_bytes", previous["peak_bytes"], current["peak_bytes"])
+            )
+    return regressions
+
+
+def _format_row(name, result, previous=None):
+    line = (
+        f"{name:<28} {result['seconds'] * 1000:>10.2f}ms"
+        f" {result['peak_bytes'] / 1024:>10.0f}KiB"
+    )
+    if previous is not None and previous["seconds"] > 0:
+        line += f"  ({result['seconds'] / previous['seconds'] - 1:+.0%})"
+    return line
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(
+        prog="python -m benchmarks.run",
+        description="계획 파이프라인 벤치마크 (Gemini 스텁, 오프라인)",
+    )
+    parser.add_argument("-k", "--filter", help="이름이 정규식과 맞는 케이스만 실행")
+    parser.add_argument("--quick", action="store_true", help="7/21일, 1/100건만 측정")
+    parser.add_argument("--repeats", type=int, default=5)
+    parser.add_argument(
+        "--gemini-latency",
+        type=float,
+        default=0.0,
+        help="스텁 Gemini 호출 한 번의 지연 시간(초)",
+    )
+    parser.add_argument("--workers", type=int, default=8, help="배치 분석 동시 요청 수")
+    parser.add_argument("--baseline", default=DEFAULT_BASELINE)
+    parser.add_argument(
+        "--save-baseline", action="store_true", help="결과를 기준선 파일로 저장"
+    )
+    parser.add_argument("-o", "--output", help="이번 결과를 저장할 JSON 파일")
+    parser.add_argument(
+        "--threshold", type=float, default=0.2, help="시간 회귀 판정 비율"
+    )
+    parser.add_argument(
+        "--memory-threshold", type=float, default=0.2, help="메모리 회귀 판정 비율"
+    )
+    parser.add_argument(
+        "--min-delta",
+        type=float,
+        default=0.0005,
+        help="이보다 작은 시간 증가(초)는 측정 잡음으로 보고 무시",
+    )
+    args = parser.parse_args(argv)
+
+    from benchmarks.stub import create_stub_service
+
+    horizons = QUICK_HORIZONS if args.quick else HORIZONS
+    batch_sizes = QUICK_BATCH_SIZES if args.quick else BATCH_SIZES
+    service = create_stub_service(args.gemini_latency, max_in_flight=args.workers)
+    pattern = re.compile(args.filter) if args.filter else None
+
+    baseline = {}
+    if not args.save_baseline and os.path.exists(args.baseline):
+        with open(args.baseline, encoding="utf-8") as f:
+            baseline = json.load(f)["results"]
+
+    cases = [
+        *plan_cases(horizons, service),
+        *batch_cases(horizons, batch_sizes, service, args.workers),
+    ]
+    results = {}
+    for name, fn in cases:
+        if pattern is not None and not pattern.search(name):
+            continue
+        # 큰 배치는 한 번만 측정 (1000건 x 365일은 수십 초 소요)
+        repeats = (
+            1 if name.startswith("batch/") and not name.endswith("/1") else args.repeats
+        )
+        results[name] = measure(fn, repeats)
+        print(_format_row(name, results[name], baseline.get(name)), flush=True)
+
+    report = {"environment": environment(), "results": results}
+    if args.output:
+        with open(args.output, "w", encoding="utf-8") as f:
+            json.dump(report, f, ensure_ascii=False, indent=2)
+    if args.save_baseline:
+        with open(args.baseline, "w", encoding="utf-8") as f:
+            json.dump(report, f, ensure_ascii=False, indent=2)
+        print(f"기준선 저장: {args.baseline}")
+        return 0
+    if not baseline:
+        print("비교할 기준선이 없습니다. --save-baseline으로 먼저 저장하세요.")
+        return 0
+
+    regressions = compare(
+        results, baseline, args.threshold, args.memory_threshold, args.min_delta
+    )
+    for name, metric, before, after in regressions:
+        print(f"회귀: {name} {metric} {before:.6g} -> {after:.6g}", file=sys.stderr)
+    return 1 if regressions else 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,60 @@
+"""
+Gemini 대신 사용하는 결정적 로컬 스텁 모델.
+
+같은 프롬프트에는 항상 같은 훈련 목록을 돌려주고, 설정한 지연 시간만큼 기다린 뒤
+응답합니다. 네트워크나 API 키 없이 분석 경로(AnalysisService, 요청 풀)를 측정합니다.
+"""
+
+import hashlib
+import json
+import time
+from types import SimpleNamespace
+
+from performanceplan.analysis import AnalysisService
+from performanceplan.lexicon import TRAINING_LEXICON
+from performanceplan.ratelimit import ClientPool
+
+
+def stub_trainings(prompt, count=5):
+    """프롬프트 해시로 고른 훈련 목록 (사전의 훈련명과 레벨 사용)"""
+    digest = hashlib.sha256(prompt.encode("utf-8")).digest()
+    picks = dict.fromkeys(
+        TRAINING_LEXICON[b % len(TRAINING_LEXICON)][:2] for b in digest[:count]
+    )
+    return [{"name": name, "intensity_level": level} for name, level in picks]
+
+
+class StubModel:
+    """generate_content(prompt, stream=...)만 구현한 GenerativeModel 대역"""
+
+    def __init__(self, latency=0.0, chunk_size=24):
+        self.latency = latency
+        self.chunk_size = chunk_size
+        self.calls = 0
+
+    def generate_content(self, prompt, stream=False, **kwargs):
+        self.calls += 1
+        text = json.dumps({"trainings": stub_trainings(prompt)}, ensure_ascii=False)
+        usage = SimpleNamespace(
+            prompt_token_count=len(prompt) // 2,
+            candidates_token_count=len(text) // 2,
+        )
+        if not stream:
+            time.sleep(self.latency)
+            return SimpleNamespace(text=text, usage_metadata=usage)
+        return self._stream(text, usage)
+
+    def _stream(self, text, usage):
+        chunks = [
+            text[i : i + self.chunk_size] for i in range(0, len(text), self.chunk_size)
+        ]
+        for i, chunk in enumerate(chunks):
+            time.sleep(self.latency / len(chunks))
+            last = i == len(chunks) - 1
+            yield SimpleNamespace(text=chunk, usage_metadata=usage if last else None)
+
+
+def create_stub_service(latency=0.0, max_in_flight=4, cache=None):
+    """스텁 모델을 쓰는 AnalysisService (RPM/TPM 제한 없음)"""
+    pool = ClientPool(lambda: StubModel(latency), max_in_flight=max_in_flight)
+    return AnalysisService(pool, cache=cache)
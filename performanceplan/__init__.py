@@ -0,0 +1,42 @@
+"""
+Peak Performance Planner 핵심 패키지.
+
+Streamlit, Plotly, google-generativeai 없이 계획 엔진을 사용할 수 있습니다.
+아래 공개 함수는 처음 접근할 때 해당 모듈을 import 하므로
+`import performanceplan` 자체는 무거운 의존성을 불러오지 않습니다.
+"""
+
+import importlib
+
+_EXPORTS = {
+    "LEVEL_LABELS": "performanceplan.planner",
+    "MAX_PLAN_DAYS": "performanceplan.planner",
+    "get_trainings_by_level": "performanceplan.planner",
+    "analyzed_levels": "performanceplan.planner",
+    "get_detailed_guide": "performanceplan.planner",
+    "generate_dynamic_plan": "performanceplan.planner",
+    "generate_plan": "performanceplan.planner",
+    "generate_compact_plan": "performanceplan.planner",
+    "plan_frame": "performanceplan.planner",
+    "edit_plan_day": "performanceplan.planner",
+    "Plan": "performanceplan.plan",
+    "plan_ensemble": "performanceplan.planner",
+    "add_performance_levels": "performanceplan.planner",
+    "get_intuitive_df_for_csv": "performanceplan.planner",
+    "optimize_schedule": "performanceplan.optimizer",
+    "simulate": "performanceplan.engine",
+    "create_performance_chart": "performanceplan.charts",
+    "create_intensity_chart": "performanceplan.charts",
+    "generate_calendar_html": "performanceplan.render",
+}
+
+__all__ = list(_EXPORTS)
+
+
+def __getattr__(name):
+    module_name = _EXPORTS.get(name)
+    if module_name is None:
+        raise AttributeError(f"module 'performanceplan' has no attribute {name!r}")
+    value = getattr(importlib.import_module(module_name), name)
+    globals()[name] = value
+    return value
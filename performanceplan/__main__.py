@@ -0,0 +1,5 @@
+import sys
+
+from performanceplan.cli import main
+
+sys.exit(main())
@@ -0,0 +1,392 @@
+"""
+훈련 분석 서비스 (Streamlit 없이도 사용 가능).
+
+분석기는 analyze(user_text, goal, on_training=None, on_queue=None)로 훈련 목록을
+반환하는 객체입니다. 기본 구성은 로컬 키워드 분류기(LocalAnalyzer)로 먼저 분석하고
+신뢰도가 낮을 때만 Gemini 분석 서비스(AnalysisService)를 호출합니다(TieredAnalyzer).
+"""
+
+import json
+import logging
+import os
+import re
+import threading
+import time
+
+from performanceplan.cache import PersistentCache, make_cache_key
+from performanceplan.lexicon import classify
+from performanceplan.metrics import increment, observe, timed
+from performanceplan.ratelimit import ClientPool
+from performanceplan.singleflight import SingleFlight
+from performanceplan.streaming import TrainingStreamParser
+
+logger = logging.getLogger(__name__)
+
+GEMINI_MODEL_NAME = "gemini-2.0-flash"
+# 프롬프트나 응답 스키마를 바꾸면 버전을 올려 이전 분석 결과 캐시를 무효화합니다.
+ANALYSIS_PROMPT_VERSION = "v2"
+
+# 모델에 한 번만 설정하는 고정 지시문. 출력 형식은 응답 스키마로 강제하므로 적지 않습니다.
+SYSTEM_INSTRUCTION = """스포츠 과학 코치로서 목표와 훈련 설명을 분석해 훈련 목록을 만드세요.
+1. 설명에 나온 훈련을 모두 추출합니다.
+2. 목표 종목에 필수적인 보조 훈련을 추가합니다 (예: 마라톤 - 코어 운동, 스트레칭).
+3. 각 훈련의 intensity_level을 1-7로 정합니다.
+1 완전 휴식(수면, 명상) / 2 가벼운 회복(산책, 회복 스트레칭) /
+3 기술 훈련(기술 연습, 폼 롤링) / 4 지구력(대화 가능한 유산소, 장거리) /
+5 템포(역치, 약간 숨찬 지속 훈련) / 6 고강도 인터벌(최대 심박 근접, 고중량 근력) /
+7 최대 강도(시합, PR 도전)"""
+
+# 구조화 출력(JSON) 응답 스키마
+TRAININGS_SCHEMA = {
+    "type": "object",
+    "properties": {
+        "trainings": {
+            "type": "array",
+            "items": {
+                "type": "object",
+                "properties": {
+                    "name": {"type": "string"},
+                    "intensity_level": {"type": "integer"},
+                },
+                "required": ["name", "intensity_level"],
+            },
+        }
+    },
+    "required": ["trainings"],
+}
+
+MAX_OUTPUT_TOKENS = int(os.getenv("PLANNER_GEMINI_MAX_OUTPUT_TOKENS", "512"))
+# 요청 슬롯을 얻은 뒤 응답 생성에 주는 여유 시간(초). 같은 요청 대기자의 기본 대기 한도에 포함
+GENERATION_ALLOWANCE = float(os.getenv("PLANNER_GEMINI_GENERATION_ALLOWANCE", "60"))
+
+
+def build_prompt(user_text, goal):
+    """호출마다 보내는 사용자 입력 부분 (고정 지시문은 SYSTEM_INSTRUCTION)"""
+    return f"목표: {goal}\n훈련 설명: {user_text}"
+
+
+def generation_config(max_output_tokens=MAX_OUTPUT_TOKENS):
+    """JSON 응답 MIME 타입과 스키마, 출력 토큰 상한을 지정한 생성 설정"""
+    return {
+        "response_mime_type": "application/json",
+        "response_schema": TRAININGS_SCHEMA,
+        "max_output_tokens": max_output_tokens,
+    }
+
+
+def estimate_tokens(text, max_output_tokens=MAX_OUTPUT_TOKENS):
+    """TPM 제한용 대략적인 토큰 수 (한국어 기준 약 2자당 1토큰 + 출력 상한)"""
+    return (len(SYSTEM_INSTRUCTION) + len(text)) // 2 + max_output_tokens
+
+
+def parse_trainings(response_text):
+    """
+    응답 JSON에서 trainings 목록을 추출.
+    구조화 출력에서는 응답이 곧 JSON이며, 스키마 없이 설정된 모델의 코드 펜스도 허용합니다.
+    """
+    try:
+        parsed_json = json.loads(response_text)
+    except json.JSONDecodeError:
+        parsed_json = json.loads(re.sub(r"```json\n|```", "", response_text).strip())
+    return parsed_json.get("trainings", [])
+
+
+class TruncatedResponse(ValueError):
+    """출력 토큰 상한(MAX_TOKENS)에 걸려 응답이 중간에 끊긴 경우"""
+
+
+def finish_reason(response):
+    """응답(또는 스트리밍 청크)의 첫 후보 종료 사유 이름 (없으면 None)"""
+    candidates = getattr(response, "candidates", None) or ()
+    if not candidates:
+        return None
+    reason = getattr(candidates[0], "finish_reason", None)
+    if reason is None:
+        return None
+    # proto enum은 이름으로, 정수로만 온 경우는 Candidate.FinishReason 값으로 비교
+    return getattr(reason, "name", None) or {2: "MAX_TOKENS"}.get(reason, str(reason))
+
+
+class UsageMeter:
+    """Gemini 호출별 입력/출력 토큰 수와 지연 시간 누적 (스레드 안전)"""
+
+    def __init__(self):
+        self.calls = 0
+        self.prompt_tokens = 0
+        self.output_tokens = 0
+        self.parse_failures = 0
+        self.total_seconds = 0.0
+        self._lock = threading.Lock()
+
+    def record(self, usage, seconds):
+        """usage: 응답의 usage_metadata (없으면 토큰 수는 0으로 기록)"""
+        prompt_tokens = getattr(usage, "prompt_token_count", 0) or 0
+        output_tokens = getattr(usage, "candidates_token_count", 0) or 0
+        with self._lock:
+            self.calls += 1
+            self.prompt_tokens += prompt_tokens
+            self.output_tokens += output_tokens
+            self.total_seconds += seconds
+        observe("gemini.call", seconds)
+        logger.info(
+            "Gemini 호출: 입력 %d 토큰, 출력 %d 토큰, %.2fs",
+            prompt_tokens,
+            output_tokens,
+            seconds,
+        )
+
+    def parse_failed(self):
+        with self._lock:
+            self.parse_failures += 1
+        increment("gemini.parse_failures")
+
+    def stats(self):
+        with self._lock:
+            calls = self.calls
+            return {
+                "calls": calls,
+                "prompt_tokens": self.prompt_tokens,
+                "output_tokens": self.output_tokens,
+                "avg_prompt_tokens": self.prompt_tokens / calls if calls else 0.0,
+                "avg_output_tokens": self.output_tokens / calls if calls else 0.0,
+                "avg_seconds": self.total_seconds / calls if calls else 0.0,
+                "parse_failures": self.parse_failures,
+            }
+
+
+class AnalysisService:
+    """
+    결과 캐시, single-flight, 요청 풀을 묶은 분석 서비스.
+    Streamlit 앱과 배치 처리가 같은 경로로 Gemini를 호출합니다.
+    실패 시 예외를 그대로 전달하므로 오류 표시는 호출 측에서 담당합니다.
+    같은 요청을 기다리는 호출자의 한도(wait_timeout)는 리더의 대기열 한도(queue_timeout)에
+    GENERATION_ALLOWANCE를 더한 값보다 짧아지지 않습니다 (None이면 그 값).
+    """
+
+    def __init__(
+        self,
+        pool,
+        cache=None,
+        singleflight=None,
+        model_name=GEMINI_MODEL_NAME,
+        streaming=True,
+        wait_timeout=None,
+        queue_timeout=120.0,
+    ):
+        self.pool = pool
+        self.cache = cache
+        self.singleflight = singleflight or SingleFlight()
+        self.model_name = model_name
+        self.streaming = streaming
+        self.queue_timeout = queue_timeout
+        # 같은 요청의 대기자가 리더(대기열 + 생성)보다 먼저 포기하지 않도록 한도를 맞춤
+        if queue_timeout is None:
+            self.wait_timeout = None
+        else:
+            self.wait_timeout = max(
+                wait_timeout or 0.0, queue_timeout + GENERATION_ALLOWANCE
+            )
+        self.usage = UsageMeter()
+
+    def cache_key(self, user_text, goal):
+        return make_cache_key(goal, user_text, self.model_name, ANALYSIS_PROMPT_VERSION)
+
+    def analyze(self, user_text, goal, on_training=None, on_queue=None):
+        """
+        훈련 목록을 반환. on_training은 스트리밍 중 완성된 훈련 항목마다,
+        on_queue는 요청 대기열의 순번이 바뀔 때마다 호출됩니다.
+        """
+        # 동일한 (목표, 설명, 모델, 프롬프트 버전) 요청은 캐시된 결과를 즉시 반환
+        cache_key = self.cache_key(user_text, goal)
+        if self.cache is not None:
+            cached = self.cache.get(cache_key)
+            if cached is not None:
+                return cached
+
+        # 진행 중인 동일 요청이 있으면 새로 호출하지 않고 그 결과를 함께 받음
+        return self.singleflight.do(
+            cache_key,
+            self._request,
+            user_text,
+            goal,
+            cache_key,
+            on_training=on_training,
+            on_queue=on_queue,
+            timeout=self.wait_timeout,
+        )
+
+    def _request(self, user_text, goal, cache_key, on_training=None, on_queue=None):
+        """Gemini를 실제로 호출하고 결과를 캐시에 저장"""
+        prompt = build_prompt(user_text, goal)
+        with self.pool.slot(
+            tokens=estimate_tokens(prompt),
+            on_wait=on_queue,
+            timeout=self.queue_timeout,
+        ) as model:
+            started = time.perf_counter()
+            usage, reason = None, None
+            if self.streaming:
+                parser = TrainingStreamParser()
+                for chunk in model.generate_content(prompt, stream=True):
+                    # 토큰 사용량과 종료 사유는 마지막 청크에 들어옴
+                    usage = getattr(chunk, "usage_metadata", None) or usage
+                    reason = finish_reason(chunk) or reason
+                    for training in parser.feed(chunk.text):
+                        if on_training is not None:
+                            on_training(training)
+                response_text = parser.text
+            else:
+                response = model.generate_content(prompt)
+                usage = getattr(response, "usage_metadata", None)
+                reason = finish_reason(response)
+                response_text = response.text
+            self.usage.record(usage, time.perf_counter() - started)
+
+        # 스트리밍 중 꺼낸 항목은 미리보기일 뿐이며, 캐시에는 완성된 전체 응답만 저장
+        try:
+            if reason == "MAX_TOKENS":
+                raise TruncatedResponse(
+                    f"출력 토큰 상한({MAX_OUTPUT_TOKENS})에 걸려 응답이 잘렸습니다."
+                )
+            trainings = parse_trainings(response_text)
+        except ValueError:
+            self.usage.parse_failed()
+            raise
+        if self.streaming and trainings != parser.trainings:
+            logger.debug("스트리밍 중 추출한 항목과 최종 응답이 다릅니다.")
+        if trainings and self.cache is not None:
+            self.cache.set(cache_key, trainings)
+        return trainings
+
+    def stats(self):
+        stats = {"usage": self.usage.stats(), "pool": self.pool.stats()}
+        if self.cache is not None:
+            stats["cache"] = self.cache.stats()
+        return stats
+
+
+class AnalyzerUnavailable(RuntimeError):
+    """로컬 분류 신뢰도가 낮은데 Gemini 분석기를 사용할 수 없는 경우"""
+
+
+class LocalAnalyzer:
+    """
+    키워드 사전으로 분석하는 로컬 분석기 (네트워크 호출 없음).
+    단독으로 쓰면 신뢰도와 관계없이 결과를 반환하므로 오프라인 대체 분석기로 사용할 수 있습니다.
+    """
+
+    def classify(self, user_text, goal):
+        with timed("analysis.local"):
+            return classify(user_text, goal)
+
+    def analyze(self, user_text, goal, on_training=None, on_queue=None):
+        trainings = self.classify(user_text, goal).trainings
+        if on_training is not None:
+            for training in trainings:
+                on_training(training)
+        return trainings
+
+
+class TieredAnalyzer:
+    """
+    로컬 분류 신뢰도가 min_confidence를 넘으면 그 결과를 바로 반환하고,
+    아니면 fallback(Gemini 분석 서비스)을 호출합니다.
+    """
+
+    def __init__(self, local, fallback=None, min_confidence=0.75):
+        self.local = local
+        self.fallback = fallback
+        self.min_confidence = min_confidence
+        self.local_hits = 0
+        self.fallbacks = 0
+        self._lock = threading.Lock()
+
+    def analyze(self, user_text, goal, on_training=None, on_queue=None):
+        result = self.local.classify(user_text, goal)
+        if result.trainings and result.confidence > self.min_confidence:
+            with self._lock:
+                self.local_hits += 1
+            if on_training is not None:
+                for training in result.trainings:
+                    on_training(training)
+            return result.trainings
+
+        logger.debug("로컬 분류 신뢰도 %.2f, Gemini로 분석합니다.", result.confidence)
+        if self.fallback is None:
+            raise AnalyzerUnavailable(
+                "설명을 로컬에서 분석할 수 없고 Gemini 분석기가 설정되지 않았습니다."
+            )
+        with self._lock:
+            self.fallbacks += 1
+        with timed("analysis.gemini"):
+            return self.fallback.analyze(
+                user_text, goal, on_training=on_training, on_queue=on_queue
+            )
+
+    def stats(self):
+        total = self.local_hits + self.fallbacks
+        stats = {
+            "local_hits": self.local_hits,
+            "fallbacks": self.fallbacks,
+            "local_ratio": self.local_hits / total if total else 0.0,
+        }
+        if self.fallback is not None:
+            stats["gemini"] = self.fallback.stats()
+        return stats
+
+
+def create_gemini_service(cache_dir, api_key=None):
+    """
+    환경 변수 설정을 읽어 Gemini 분석 서비스를 생성.
+    google-generativeai는 실제 모델이 필요할 때 처음 import 합니다.
+    """
+
+    def model_factory():
+        import google.generativeai as genai
+
+        if api_key:
+            genai.configure(api_key=api_key)
+        return genai.GenerativeModel(
+            GEMINI_MODEL_NAME,
+            system_instruction=SYSTEM_INSTRUCTION,
+            generation_config=generation_config(),
+        )
+
+    pool = ClientPool(
+        model_factory,
+        max_in_flight=int(os.getenv("PLANNER_GEMINI_MAX_IN_FLIGHT", "4")),
+        rpm=int(os.getenv("PLANNER_GEMINI_RPM", "15")),
+        tpm=int(os.getenv("PLANNER_GEMINI_TPM", "1000000")),
+    )
+    cache = PersistentCache(
+        os.path.join(cache_dir, "analysis.sqlite3"),
+        max_entries=int(os.getenv("PLANNER_ANALYSIS_CACHE_SIZE", "5000")),
+        ttl=int(os.getenv("PLANNER_ANALYSIS_CACHE_TTL", str(7 * 24 * 3600))),
+    )
+    return AnalysisService(
+        pool,
+        cache=cache,
+        streaming=os.getenv("PLANNER_ANALYSIS_STREAM", "1") != "0",
+        wait_timeout=float(os.getenv("PLANNER_ANALYSIS_WAIT_TIMEOUT", "0")) or None,
+        queue_timeout=float(os.getenv("PLANNER_GEMINI_QUEUE_TIMEOUT", "120")),
+    )
+
+
+def create_analyzer(cache_dir, api_key=None, gemini=True):
+    """
+    PLANNER_ANALYZER 설정에 따라 분석기를 생성.
+    auto(기본): 로컬 분류 후 신뢰도가 낮으면 Gemini, local: 로컬만, gemini: 항상 Gemini.
+    gemini=False이면 (API 키가 없는 경우 등) auto에서도 Gemini를 사용하지 않습니다.
+    """
+    mode = os.getenv("PLANNER_ANALYZER", "auto")
+    if mode == "local":
+        return LocalAnalyzer()
+    if mode == "gemini":
+        return create_gemini_service(cache_dir, api_key=api_key)
+    if mode != "auto":
+        raise ValueError(f"알 수 없는 PLANNER_ANALYZER 값입니다: {mode}")
+    return TieredAnalyzer(
+        LocalAnalyzer(),
+        create_gemini_service(cache_dir, api_key=api_key) if gemini else None,
+        min_confidence=float(os.getenv("PLANNER_LOCAL_MIN_CONFIDENCE", "0.75")),
+    )
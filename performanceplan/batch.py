@@ -0,0 +1,317 @@
+"""
+선수 명단(CSV/JSON)으로 여러 선수의 훈련 계획을 한 번에 생성하는 배치 모드.
+
+I/O 중심인 Gemini 분석은 스레드 풀에서, CPU 중심인 계획 생성과 캘린더 렌더링은
+프로세스 풀에서 실행하며, 선수별 결과는 완료되는 즉시 출력 파일에 기록합니다.
+
+사용 예:
+    python -m performanceplan batch roster.csv -o plans.jsonl
+"""
+
+import argparse
+import csv
+import json
+import os
+import sys
+import time
+from concurrent.futures import (
+    FIRST_COMPLETED,
+    ProcessPoolExecutor,
+    ThreadPoolExecutor,
+    wait,
+)
+from datetime import date
+
+from performanceplan.export import (
+    ICS_FOOTER,
+    ics_events,
+    ics_header,
+    parquet_available,
+)
+from performanceplan.planner import (
+    LEVEL_LABELS,
+    add_performance_levels,
+    generate_plan,
+    get_intuitive_df_for_csv,
+    get_trainings_by_level,
+    validate_period,
+)
+from performanceplan.render import generate_calendar_html
+
+ROSTER_FIELDS = ("athlete", "goal", "description", "start_date", "end_date")
+
+
+def load_roster(path):
+    """CSV 또는 JSON 명단 파일을 읽어 선수별 요청 목록으로 반환"""
+    if path.lower().endswith(".json"):
+        with open(path, encoding="utf-8") as f:
+            data = json.load(f)
+        if isinstance(data, dict):
+            data = data.get("athletes", [])
+    else:
+        with open(path, encoding="utf-8-sig", newline="") as f:
+            data = list(csv.DictReader(f))
+
+    entries = []
+    for row in data:
+        entry = {field: str(row.get(field) or "").strip() for field in ROSTER_FIELDS}
+        entries.append(entry)
+    return entries
+
+
+def validate_entry(entry):
+    """명단 한 줄을 검사하고 (시작일, 종료일)을 반환 (잘못된 경우 ValueError)"""
+    if not entry["description"]:
+        raise ValueError("훈련 계획 설명이 비어 있습니다.")
+    start_day = date.fromisoformat(entry["start_date"])
+    end_day = date.fromisoformat(entry["end_date"])
+    validate_period(start_day, end_day)
+    return start_day, end_day
+
+
+def build_plan_record(entry, training_list):
+    """분석된 훈련 목록으로 한 선수의 계획과 캘린더를 생성 (프로세스 풀 작업)"""
+    start_day, end_day = validate_entry(entry)
+    plan_df = generate_plan(start_day, end_day, get_trainings_by_level(training_list))
+    seed = plan_df.attrs["seed"]
+    plan_df = add_performance_levels(plan_df)
+    return {
+        **entry,
+        "seed": seed,
+        "trainings": training_list,
+        "plan": get_intuitive_df_for_csv(plan_df, LEVEL_LABELS).to_dict("records"),
+        "calendar_html": generate_calendar_html(plan_df, LEVEL_LABELS),
+    }
+
+
+class JSONLinesWriter:
+    """선수별 결과(오류 포함)를 한 줄에 하나씩 기록"""
+
+    def __init__(self, path):
+        self._file = open(path, "w", encoding="utf-8")
+
+    def write(self, record):
+        self._file.write(json.dumps(record, ensure_ascii=False, default=str) + "\n")
+        self._file.flush()
+
+    def close(self):
+        self._file.close()
+
+
+class CSVWriter:
+    """모든 선수의 일별 계획을 '선수' 열을 붙여 하나의 CSV로 기록 (오류 행은 제외)"""
+
+    def __init__(self, path):
+        self._file = open(path, "w", encoding="utf-8-sig", newline="")
+        self._writer = None
+
+    def write(self, record):
+        if "error" in record:
+            return
+        for row in record["plan"]:
+            if self._writer is None:
+                self._writer = csv.DictWriter(
+                    self._file, fieldnames=["선수", "목표", *row.keys()]
+                )
+                self._writer.writeheader()
+            self._writer.writerow(
+                {"선수": record["athlete"], "목표": record["goal"], **row}
+            )
+        self._file.flush()
+
+    def close(self):
+        self._file.close()
+
+
+class ICSWriter:
+    """모든 선수의 훈련일을 하나의 iCalendar 파일에 일정으로 기록 (오류 행은 제외)"""
+
+    def __init__(self, path, calendar_name="훈련 계획"):
+        self._file = open(path, "w", encoding="utf-8", newline="")
+        self._file.write(ics_header(calendar_name))
+
+    def write(self, record):
+        if "error" in record:
+            return
+        uid_prefix = f"{record['row']}-{record['seed']}"
+        events = ics_events(
+            record["plan"], uid_prefix, summary_prefix=f"[{record['athlete']}] "
+        )
+        self._file.writelines(events)
+        self._file.flush()
+
+    def close(self):
+        self._file.write(ICS_FOOTER)
+        self._file.close()
+
+
+class ParquetWriter:
+    """선수마다 row group 하나씩 Parquet 파일에 기록 (pyarrow 필요, 오류 행은 제외)"""
+
+    def __init__(self, path):
+        import pyarrow.parquet as pq
+
+        self._pq = pq
+        self._path = path
+        self._writer = None
+
+    def write(self, record):
+        import pyarrow as pa
+
+        if "error" in record:
+            return
+        rows = [
+            {"선수": record["athlete"], "목표": record["goal"], **row}
+            for row in record["plan"]
+        ]
+        table = pa.Table.from_pylist(rows)
+        if self._writer is None:
+            self._writer = self._pq.ParquetWriter(self._path, table.schema)
+        self._writer.write_table(table.cast(self._writer.schema))
+
+    def close(self):
+        if self._writer is not None:
+            self._writer.close()
+
+
+def open_writer(path):
+    """확장자(.csv / .ics / .parquet / 그 외 JSON Lines)에 맞는 스트리밍 기록기"""
+    lowered = path.lower()
+    if lowered.endswith(".csv"):
+        return CSVWriter(path)
+    if lowered.endswith(".ics"):
+        return ICSWriter(path)
+    if lowered.endswith(".parquet"):
+        if not parquet_available():
+            raise RuntimeError("Parquet 출력에는 pyarrow가 필요합니다.")
+        return ParquetWriter(path)
+    return JSONLinesWriter(path)
+
+
+def run_batch(
+    entries,
+    analyze,
+    writer,
+    analysis_workers=8,
+    plan_workers=None,
+    on_progress=None,
+):
+    """
+    명단 전체의 계획을 생성하고 처리 결과 요약을 반환.
+    analyze(description, goal)는 훈련 목록을 반환하는 함수이며,
+    on_progress(완료 수, 전체 수, 결과 레코드)는 선수 한 명이 끝날 때마다 호출됩니다.
+    """
+    started = time.perf_counter()
+    total = len(entries)
+    summary = {"total": total, "succeeded": 0, "failed": 0, "errors": []}
+
+    def finish(record):
+        if "error" in record:
+            summary["failed"] += 1
+            summary["errors"].append(
+                {
+                    "row": record["row"],
+                    "athlete": record["athlete"],
+                    "error": record["error"],
+                }
+            )
+        else:
+            summary["succeeded"] += 1
+        writer.write(record)
+        if on_progress is not None:
+            on_progress(summary["succeeded"] + summary["failed"], total, record)
+
+    def failure(row, entry, error):
+        return {"row": row, **entry, "error": f"{type(error).__name__}: {error}"}
+
+    with ThreadPoolExecutor(analysis_workers) as io_pool, ProcessPoolExecutor(
+        plan_workers
+    ) as cpu_pool:
+        pending = {}
+        for row, entry in enumerate(entries, start=1):
+            try:
+                validate_entry(entry)
+            except ValueError as e:
+                finish(failure(row, entry, e))
+                continue
+            future = io_pool.submit(analyze, entry["description"], entry["goal"])
+            pending[future] = ("analysis", row, entry)
+
+        while pending:
+            done, _ = wait(pending, return_when=FIRST_COMPLETED)
+            for future in done:
+                stage, row, entry = pending.pop(future)
+                try:
+                    result = future.result()
+                except Exception as e:
+                    finish(failure(row, entry, e))
+                    continue
+                if stage == "analysis":
+                    if not result:
+                        finish(
+                            failure(row, entry, ValueError("분석된 훈련이 없습니다."))
+                        )
+                        continue
+                    future = cpu_pool.submit(build_plan_record, entry, result)
+                    pending[future] = ("plan", row, entry)
+                else:
+                    finish({"row": row, **result})
+
+    elapsed = time.perf_counter() - started
+    summary["elapsed_seconds"] = round(elapsed, 3)
+    summary["plans_per_second"] = (
+        round(summary["succeeded"] / elapsed, 2) if elapsed else 0.0
+    )
+    return summary
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(
+        prog="python -m performanceplan batch",
+        description="선수 명단(CSV/JSON)으로 훈련 계획을 일괄 생성합니다.",
+    )
+    parser.add_argument(
+        "roster",
+        help="athlete, goal, description, start_date, end_date 열을 가진 명단 파일",
+    )
+    parser.add_argument(
+        "-o",
+        "--output",
+        default="plans.jsonl",
+        help="결과 파일 (.jsonl, .csv, .ics, .parquet)",
+    )
+    parser.add_argument("--analysis-workers", type=int, default=8)
+    parser.add_argument("--plan-workers", type=int, default=None)
+    parser.add_argument("--cache-dir", default=os.getenv("PLANNER_CACHE_DIR", ".cache"))
+    args = parser.parse_args(argv)
+
+    # GEMINI_API_KEY가 없으면 로컬 분류기로 분석 가능한 선수만 처리하고 나머지는 오류로 기록
+    from performanceplan.analysis import create_analyzer
+
+    api_key = os.getenv("GEMINI_API_KEY")
+    service = create_analyzer(args.cache_dir, api_key=api_key, gemini=bool(api_key))
+    entries = load_roster(args.roster)
+
+    def report(done, total, record):
+        status = f"오류: {record['error']}" if "error" in record else "완료"
+        print(f"[{done}/{total}] {record['athlete']} - {status}", file=sys.stderr)
+
+    writer = open_writer(args.output)
+    try:
+        summary = run_batch(
+            entries,
+            service.analyze,
+            writer,
+            analysis_workers=args.analysis_workers,
+            plan_workers=args.plan_workers,
+            on_progress=report,
+        )
+    finally:
+        writer.close()
+
+    print(json.dumps(summary, ensure_ascii=False, indent=2))
+    return 0 if summary["failed"] == 0 else 1
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,290 @@
+"""인메모리 LRU 계층과 SQLite 디스크 계층으로 구성된 결과 캐시"""
+
+import contextlib
+import hashlib
+import json
+import logging
+import os
+import sqlite3
+import threading
+import time
+import unicodedata
+from collections import OrderedDict
+
+logger = logging.getLogger(__name__)
+
+_MISSING = object()
+
+
+def normalize_text(text):
+    """캐시 키 비교를 위해 유니코드 정규화 및 공백 정리"""
+    if text is None:
+        return ""
+    text = unicodedata.normalize("NFC", str(text))
+    return " ".join(text.split())
+
+
+def make_cache_key(*parts):
+    """정규화된 요소들로부터 고정 길이 캐시 키를 생성"""
+    normalized = [normalize_text(p) if isinstance(p, str) else p for p in parts]
+    payload = json.dumps(normalized, ensure_ascii=False, sort_keys=True, default=str)
+    return hashlib.sha256(payload.encode("utf-8")).hexdigest()
+
+
+class LRUCache:
+    """TTL과 최대 항목 수 제한을 갖는 스레드 안전 인메모리 LRU 캐시"""
+
+    def __init__(self, max_entries=256, ttl=None):
+        self.max_entries = max_entries
+        self.ttl = ttl
+        self._data = OrderedDict()  # key -> (만료 시각 또는 None, 값)
+        self._lock = threading.Lock()
+        self.hits = 0
+        self.misses = 0
+        self.evictions = 0
+
+    def get(self, key, default=None):
+        with self._lock:
+            entry = self._data.get(key, _MISSING)
+            if entry is _MISSING:
+                self.misses += 1
+                return default
+            expires_at, value = entry
+            if expires_at is not None and expires_at <= time.time():
+                del self._data[key]
+                self.misses += 1
+                return default
+            self._data.move_to_end(key)
+            self.hits += 1
+            return value
+
+    def set(self, key, value, ttl=_MISSING):
+        ttl = self.ttl if ttl is _MISSING else ttl
+        expires_at = time.time() + ttl if ttl else None
+        with self._lock:
+            self._data[key] = (expires_at, value)
+            self._data.move_to_end(key)
+            while len(self._data) > self.max_entries:
+                self._data.popitem(last=False)
+                self.evictions += 1
+
+    def pop(self, key, default=None):
+        with self._lock:
+            entry = self._data.pop(key, _MISSING)
+        return default if entry is _MISSING else entry[1]
+
+    def clear(self):
+        with self._lock:
+            self._data.clear()
+
+    def __len__(self):
+        return len(self._data)
+
+    def __contains__(self, key):
+        return self.get(key, _MISSING) is not _MISSING
+
+    def stats(self):
+        lookups = self.hits + self.misses
+        return {
+            "entries": len(self._data),
+            "hits": self.hits,
+            "misses": self.misses,
+            "evictions": self.evictions,
+            "hit_ratio": self.hits / lookups if lookups else 0.0,
+        }
+
+
+class SQLiteTable:
+    """
+    WAL 모드 SQLite 파일의 테이블 하나 (PersistentCache와 계획 저장소의 디스크 계층).
+    연결 하나를 잠금으로 공유하며, 테이블에는 키 열과 accessed_at 열이 있어야 합니다.
+    파일을 열 수 없으면 available이 False이며 호출 측은 메모리 계층만 사용합니다.
+    """
+
+    def __init__(self, path, table, key, columns, name="디스크 캐시"):
+        self.path = path
+        self.table = table
+        self.key = key
+        self._lock = threading.Lock()
+        self._conn = self._connect(path, columns, name)
+
+    def _connect(self, path, columns, name):
+        try:
+            directory = os.path.dirname(path)
+            if directory:
+                os.makedirs(directory, exist_ok=True)
+            conn = sqlite3.connect(path, check_same_thread=False, timeout=5)
+            conn.execute("PRAGMA journal_mode=WAL")
+            conn.execute(f"CREATE TABLE IF NOT EXISTS {self.table} ({columns})")
+            conn.execute(
+                f"CREATE INDEX IF NOT EXISTS {self.table}_accessed"
+                f" ON {self.table} (accessed_at)"
+            )
+            conn.commit()
+            return conn
+        except (sqlite3.Error, OSError) as e:
+            logger.warning("%s를 열 수 없어 메모리만 사용합니다: %s", name, e)
+            return None
+
+    @property
+    def available(self):
+        return self._conn is not None
+
+    @contextlib.contextmanager
+    def transaction(self):
+        """잠금을 잡은 연결 (블록이 끝나면 커밋, 예외가 나면 롤백)"""
+        with self._lock, self._conn:
+            yield self._conn
+
+    def touch(self, key, now):
+        """마지막 사용 시각 갱신"""
+        with self.transaction() as conn:
+            conn.execute(
+                f"UPDATE {self.table} SET accessed_at = ? WHERE {self.key} = ?",
+                (now, key),
+            )
+
+    def prune(self, conn, expired_column=None, cutoff=None, limit=None, weight=None):
+        """
+        expired_column 값이 cutoff 이하인 행과, 행 수(weight가 있으면 그 열의 합계)가
+        limit를 넘는 만큼 오래 사용하지 않은 행을 삭제 (transaction() 안에서 호출).
+        (만료로 삭제한 행 수, 용량 초과로 삭제한 키 목록)을 반환
+        """
+        expired = 0
+        if expired_column is not None and cutoff is not None:
+            cur = conn.execute(
+                f"DELETE FROM {self.table} WHERE {expired_column} <= ?", (cutoff,)
+            )
+            expired = max(cur.rowcount, 0)
+        victims = []
+        if limit:
+            measure = weight or "1"
+            total = conn.execute(
+                f"SELECT COALESCE(SUM({measure}), 0) FROM {self.table}"
+            ).fetchone()[0]
+            excess = total - limit
+            if excess > 0:
+                # 가장 오래 사용하지 않은 행부터 누적량이 초과분을 덮을 때까지 삭제
+                for key, amount in conn.execute(
+                    f"SELECT {self.key}, {measure} FROM {self.table}"
+                    " ORDER BY accessed_at ASC"
+                ):
+                    victims.append(key)
+                    excess -= amount
+                    if excess <= 0:
+                        break
+                conn.executemany(
+                    f"DELETE FROM {self.table} WHERE {self.key} = ?",
+                    [(key,) for key in victims],
+                )
+        return expired, victims
+
+    def count(self, weight=None):
+        """(행 수, weight 열 합계)"""
+        measure = weight or "0"
+        with self.transaction() as conn:
+            return conn.execute(
+                f"SELECT COUNT(*), COALESCE(SUM({measure}), 0) FROM {self.table}"
+            ).fetchone()
+
+
+class PersistentCache:
+    """
+    JSON 직렬화 가능한 값을 저장하는 2계층 캐시.
+    자주 쓰는 항목은 프로세스 내 LRU에서, 나머지는 컨테이너 재시작 후에도
+    유지되는 SQLite 파일에서 조회합니다. 디스크를 쓸 수 없으면 메모리 계층만 사용합니다.
+    """
+
+    def __init__(self, path, max_entries=5000, memory_entries=256, ttl=7 * 24 * 3600):
+        self.path = path
+        self.max_entries = max_entries
+        self.ttl = ttl
+        self.memory = LRUCache(max_entries=memory_entries, ttl=ttl)
+        self.hits = 0
+        self.misses = 0
+        self.disk_hits = 0
+        self.evictions = 0
+        self._disk = SQLiteTable(
+            path,
+            "entries",
+            "key",
+            "key TEXT PRIMARY KEY, value TEXT NOT NULL,"
+            " expires_at REAL, accessed_at REAL NOT NULL",
+        )
+
+    def get(self, key, default=None):
+        value = self.memory.get(key, _MISSING)
+        if value is not _MISSING:
+            self.hits += 1
+            return value
+
+        value = self._disk_get(key)
+        if value is _MISSING:
+            self.misses += 1
+            return default
+        self.hits += 1
+        self.disk_hits += 1
+        self.memory.set(key, value)
+        return value
+
+    def set(self, key, value):
+        self.memory.set(key, value)
+        if not self._disk.available:
+            return
+        now = time.time()
+        expires_at = now + self.ttl if self.ttl else None
+        try:
+            with self._disk.transaction() as conn:
+                conn.execute(
+                    "INSERT OR REPLACE INTO entries VALUES (?, ?, ?, ?)",
+                    (key, json.dumps(value, ensure_ascii=False), expires_at, now),
+                )
+                # 만료된 항목과 최대 개수를 넘는 오래된 항목을 삭제
+                expired, victims = self._disk.prune(
+                    conn, "expires_at", now, self.max_entries
+                )
+            self.evictions += expired + len(victims)
+        except sqlite3.Error as e:
+            logger.warning("디스크 캐시 저장 실패: %s", e)
+
+    def _disk_get(self, key):
+        if not self._disk.available:
+            return _MISSING
+        now = time.time()
+        try:
+            with self._disk.transaction() as conn:
+                row = conn.execute(
+                    "SELECT value, expires_at FROM entries WHERE key = ?", (key,)
+                ).fetchone()
+                if row is None:
+                    return _MISSING
+                if row[1] is not None and row[1] <= now:
+                    conn.execute("DELETE FROM entries WHERE key = ?", (key,))
+                    return _MISSING
+                conn.execute(
+                    "UPDATE entries SET accessed_at = ? WHERE key = ?", (now, key)
+                )
+            return json.loads(row[0])
+        except (sqlite3.Error, ValueError) as e:
+            logger.warning("디스크 캐시 조회 실패: %s", e)
+            return _MISSING
+
+    def clear(self):
+        self.memory.clear()
+        if not self._disk.available:
+            return
+        with self._disk.transaction() as conn:
+            conn.execute("DELETE FROM entries")
+
+    def stats(self):
+        lookups = self.hits + self.misses
+        disk_entries = self._disk.count()[0] if self._disk.available else 0
+        return {
+            "memory_entries": len(self.memory),
+            "disk_entries": disk_entries,
+            "hits": self.hits,
+            "misses": self.misses,
+            "disk_hits": self.disk_hits,
+            "evictions": self.evictions + self.memory.evictions,
+            "hit_ratio": self.hits / lookups if lookups else 0.0,
+        }
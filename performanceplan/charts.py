@@ -0,0 +1,281 @@
+"""
+주기화 그래프(Plotly Figure) 생성. Plotly는 그래프를 만들 때 처음 import 합니다.
+
+cached_chart()는 계획 내용 해시별로 만든 Figure를 LRU 캐시에 보관하여
+재실행(rerun)마다 같은 그래프를 다시 만들지 않습니다. 몇 달 단위의 긴 계획은
+점 수를 CHART_MAX_POINTS 근처로 줄인(구간별 최소/최대 유지) 데이터로 그립니다.
+"""
+
+import os
+
+import numpy as np
+
+from performanceplan.cache import LRUCache, make_cache_key
+from performanceplan.metrics import timed
+from performanceplan.planner import plan_hash
+
+PERFORMANCE_HOVER = '<span style="font-size:12px;">%{x|%m월 %d일}</span><br><span style="color:#2BA7D1; font-size:14px;">■</span><span style="font-size:14px;"> <b>%{y}</b></span><extra></extra>'
+INTENSITY_HOVER = '<span style="font-size:12px;">%{x|%m월 %d일}</span><br><span style="color:#EE7D8D; font-size:14px;">■</span><span style="font-size:14px;"> <b>%{customdata} (Lvl:%{y})</b></span><extra></extra>'
+
+CHART_VIEWS = ("예상 퍼포먼스", "훈련 강도")
+# 그래프 한 trace에 그리는 최대 점(막대) 수. 이보다 긴 계획은 구간별로 줄여서 표시
+CHART_MAX_POINTS = int(os.getenv("PLANNER_CHART_MAX_POINTS", "200"))
+
+_figure_cache = LRUCache(max_entries=int(os.getenv("PLANNER_FIGURE_CACHE_SIZE", "64")))
+
+
+def _performance_traces(go, df, band):
+    traces = []
+    if band is not None:
+        traces.append(
+            go.Scatter(
+                x=df["날짜"],
+                y=band["P10"],
+                name="",
+                line=dict(width=0),
+                mode="lines",
+                hoverinfo="skip",
+            )
+        )
+        traces.append(
+            go.Scatter(
+                x=df["날짜"],
+                y=band["P90"],
+                name="",
+                line=dict(width=0),
+                fill="tonexty",
+                fillcolor="rgba(43, 167, 209, 0.18)",
+                mode="lines",
+                hoverinfo="skip",
+            )
+        )
+        traces.append(
+            go.Scatter(
+                x=df["날짜"],
+                y=band["P50"],
+                name="",
+                line=dict(color="#86929A", width=1.5, dash="dot"),
+                mode="lines",
+                hoverinfo="skip",
+            )
+        )
+    traces.append(
+        go.Scatter(
+            x=df["날짜"],
+            y=df["예상 퍼포먼스"],
+            name="",  # 빈 이름으로 설정하여 undefined 방지
+            line=dict(color="#2BA7D1", width=3),
+            fill="tozeroy" if band is None else None,
+            fillcolor="rgba(43, 167, 209, 0.1)",
+            mode="lines",
+            hovertemplate=PERFORMANCE_HOVER,
+        )
+    )
+    return traces
+
+
+def _intensity_trace(go, df, level_map):
+    # 입력 DataFrame을 변경하지 않도록 강도 설명은 별도 Series로 계산
+    descriptions = df["훈련 강도 레벨"].map(level_map)
+    return go.Bar(
+        x=df["날짜"],
+        y=df["훈련 강도 레벨"],
+        name="",  # 빈 이름으로 설정하여 undefined 방지
+        marker=dict(color="#EE7D8D", cornerradius=16),
+        customdata=descriptions,
+        hovertemplate=INTENSITY_HOVER,
+    )
+
+
+def _base_layout(font_size, margin_left, hover_font_size):
+    return dict(
+        height=350,  # 그래프 높이 증가로 가독성 개선
+        title=dict(text="", font=dict(size=1)),  # 빈 제목으로 명시적 설정
+        xaxis_title="",
+        plot_bgcolor="white",
+        paper_bgcolor="white",
+        font=dict(family="Helvetica, sans-serif", size=font_size, color="#86929A"),
+        showlegend=False,
+        margin=dict(l=margin_left, r=20, t=30, b=30),  # 여백 증가로 제목 잘림 방지
+        dragmode="pan",  # Pan 모드로 고정
+        xaxis=dict(
+            showgrid=False,
+            showline=True,
+            linecolor="#E8E8E8",
+            tickformat="%m/%d",
+            rangeslider_visible=False,  # X축 스크롤바 비활성화 - 깔끔한 표시
+            fixedrange=False,  # X축은 팬 가능
+        ),
+        hoverlabel=dict(
+            bgcolor="#0D1628",
+            font_size=hover_font_size,
+            font_color="white",
+            bordercolor="rgba(0,0,0,0)",
+            font_family="Helvetica, sans-serif",
+        ),
+        hovermode="x unified",
+    )
+
+
+def _performance_yaxis():
+    return dict(
+        title=dict(text="레벨", font=dict(size=14, color="#0D1628")),
+        showgrid=True,
+        gridcolor="#E8E8E8",
+        fixedrange=True,  # Y축 고정
+    )
+
+
+def _intensity_yaxis():
+    return dict(
+        title=dict(text=""),
+        showgrid=False,
+        showticklabels=True,
+        tickmode="array",
+        tickvals=list(range(0, 8)),
+        ticktext=[str(i) for i in range(0, 8)],
+        range=[0, 7.5],
+        zeroline=False,
+        tickfont=dict(size=9),
+        fixedrange=True,  # Y축 고정
+    )
+
+
+@timed("chart.performance")
+def create_performance_chart(df, band=None):
+    """band({"P10", "P50", "P90"})가 주어지면 앙상블 분위수 범위를 음영으로 함께 표시"""
+    import plotly.graph_objects as go
+
+    df, band, _ = decimate(df, band)
+    fig = go.Figure(_performance_traces(go, df, band))
+    fig.update_layout(**_base_layout(12, 50, 14), yaxis=_performance_yaxis())
+    return fig
+
+
+@timed("chart.intensity")
+def create_intensity_chart(df, level_map):
+    import plotly.graph_objects as go
+
+    _, _, df = decimate(df)
+    fig = go.Figure([_intensity_trace(go, df, level_map)])
+    layout = _base_layout(11, 40, 12)
+    layout["xaxis"]["tickfont"] = dict(size=11)
+    fig.update_layout(**layout, yaxis=_intensity_yaxis(), bargap=0.4)
+    return fig
+
+
+@timed("chart.combined")
+def create_combined_chart(df, level_map, band=None):
+    """
+    두 그래프의 trace를 한 Figure에 담고 상단 버튼(updatemenus)으로 전환.
+    보기 전환은 브라우저에서 trace 표시 여부와 Y축만 바꾸므로 서버 재실행이 없습니다.
+    """
+    import plotly.graph_objects as go
+
+    performance_df, band, intensity_df = decimate(df, band)
+    performance = _performance_traces(go, performance_df, band)
+    fig = go.Figure([*performance, _intensity_trace(go, intensity_df, level_map)])
+    show_performance = [True] * len(performance) + [False]
+    show_intensity = [False] * len(performance) + [True]
+    for trace, visible in zip(fig.data, show_performance):
+        trace.visible = visible
+
+    layout = _base_layout(12, 50, 14)
+    layout["margin"]["t"] = 56  # 전환 버튼 공간
+    fig.update_layout(
+        **layout,
+        yaxis=_performance_yaxis(),
+        bargap=0.4,
+        updatemenus=[
+            dict(
+                type="buttons",
+                direction="right",
+                showactive=True,
+                active=0,
+                x=0.5,
+                xanchor="center",
+                y=1.0,
+                yanchor="bottom",
+                pad=dict(b=8),
+                bgcolor="white",
+                bordercolor="#F1F1F1",
+                font=dict(size=12, color="#0D1628"),
+                buttons=[
+                    dict(
+                        label=CHART_VIEWS[0],
+                        method="update",
+                        args=[
+                            {"visible": show_performance},
+                            {"yaxis": _performance_yaxis(), "margin.l": 50},
+                        ],
+                    ),
+                    dict(
+                        label=CHART_VIEWS[1],
+                        method="update",
+                        args=[
+                            {"visible": show_intensity},
+                            {"yaxis": _intensity_yaxis(), "margin.l": 40},
+                        ],
+                    ),
+                ],
+            )
+        ],
+    )
+    return fig
+
+
+def _bucket_edges(n, max_points):
+    buckets = -(-n // max(1, max_points // 2))
+    return np.linspace(0, n, num=-(-n // buckets) + 1, dtype=np.intp)
+
+
+def decimate(df, band=None, max_points=CHART_MAX_POINTS):
+    """
+    긴 계획의 그래프용 (퍼포먼스 DataFrame, 분위수 band, 강도 DataFrame).
+    퍼포먼스 곡선은 구간마다 최소/최대 지점을 남겨 봉우리와 골을 보존하고,
+    강도 막대는 구간마다 가장 높은 강도의 날을 남깁니다. 짧은 계획은 그대로 반환합니다.
+    """
+    n = len(df)
+    if n <= max_points:
+        return df, band, df
+    edges = _bucket_edges(n, max_points)
+    performance = df["예상 퍼포먼스"].to_numpy()
+    levels = df["훈련 강도 레벨"].to_numpy()
+    keep, peaks = {0, n - 1}, []
+    for start, end in zip(edges[:-1], edges[1:]):
+        if end <= start:
+            continue
+        window = performance[start:end]
+        keep.update((start + int(window.argmin()), start + int(window.argmax())))
+        peaks.append(start + int(levels[start:end].argmax()))
+    index = np.array(sorted(keep))
+    if band is not None:
+        band = {name: np.asarray(values)[index] for name, values in band.items()}
+    return df.iloc[index], band, df.iloc[peaks]
+
+
+_BUILDERS = {
+    "performance": lambda df, level_map, band: create_performance_chart(df, band),
+    "intensity": lambda df, level_map, band: create_intensity_chart(df, level_map),
+    "combined": create_combined_chart,
+}
+
+
+def cached_chart(kind, df, level_map=None, band=None):
+    """
+    계획 해시별로 캐시된 Figure 반환 (kind: performance / intensity / combined).
+    반환된 Figure는 여러 세션이 공유하므로 수정하지 마세요.
+    """
+    band_key = None
+    if band is not None:
+        band_key = {name: [float(v) for v in values] for name, values in band.items()}
+    key = make_cache_key("chart", kind, plan_hash(df), level_map, band_key)
+    fig = _figure_cache.get(key)
+    if fig is None:
+        fig = _BUILDERS[kind](df, level_map, band)
+        _figure_cache.set(key, fig)
+    return fig
+
+
+def chart_cache_stats():
+    return _figure_cache.stats()
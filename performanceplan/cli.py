@@ -0,0 +1,149 @@
+"""
+Streamlit 없이 훈련 계획을 생성하는 명령줄 도구.
+
+사용 예:
+    python -m performanceplan plan request.json -o plan.json --calendar plan.html
+    python -m performanceplan batch roster.csv -o plans.jsonl
+
+plan 입력 JSON 필드:
+    goal, start_date, end_date (필수), description 또는 trainings,
+    seed, optimize (선택)
+trainings가 없으면 description을 로컬 키워드 분류기로 분석하고, 신뢰도가 낮으면
+Gemini로 분석합니다 (GEMINI_API_KEY 필요, PLANNER_ANALYZER=local이면 로컬만 사용).
+"""
+
+import argparse
+import json
+import os
+import sys
+from datetime import date
+
+from performanceplan.planner import (
+    LEVEL_LABELS,
+    add_performance_levels,
+    analyzed_levels,
+    generate_plan,
+    get_intuitive_df_for_csv,
+    get_trainings_by_level,
+    validate_period,
+)
+
+
+def _read_request(path):
+    if path == "-":
+        return json.load(sys.stdin)
+    with open(path, encoding="utf-8") as f:
+        return json.load(f)
+
+
+def _write_text(path, text):
+    if path == "-":
+        sys.stdout.write(text)
+        return
+    with open(path, "w", encoding="utf-8") as f:
+        f.write(text)
+
+
+def build_plan(request, analyze=None):
+    """요청 딕셔너리로 계획을 생성하고 (결과 레코드, 계획 DataFrame)을 반환"""
+    start_day = date.fromisoformat(str(request["start_date"]))
+    end_day = date.fromisoformat(str(request["end_date"]))
+    validate_period(start_day, end_day)
+
+    goal = str(request.get("goal") or "").strip()
+    training_list = request.get("trainings")
+    if not training_list:
+        description = str(request.get("description") or "").strip()
+        if not description:
+            raise ValueError("description 또는 trainings 중 하나는 있어야 합니다.")
+        if analyze is None:
+            raise ValueError("훈련 분석기가 설정되지 않았습니다.")
+        training_list = analyze(description, goal)
+        if not training_list:
+            raise ValueError("분석된 훈련이 없습니다.")
+
+    seed = request.get("seed")
+    plan_df = generate_plan(
+        start_day,
+        end_day,
+        get_trainings_by_level(training_list),
+        seed=int(seed) if seed is not None else None,
+        optimize=bool(request.get("optimize", False)),
+        allowed_levels=analyzed_levels(training_list),
+    )
+    seed = plan_df.attrs["seed"]
+    plan_df = add_performance_levels(plan_df)
+    record = {
+        "goal": goal,
+        "start_date": start_day.isoformat(),
+        "end_date": end_day.isoformat(),
+        "seed": seed,
+        "trainings": training_list,
+        "plan": get_intuitive_df_for_csv(plan_df, LEVEL_LABELS).to_dict("records"),
+    }
+    return record, plan_df
+
+
+def _analyzer(cache_dir):
+    """로컬 분류기 + (GEMINI_API_KEY가 있으면) Gemini 분석기"""
+    from performanceplan.analysis import create_analyzer
+
+    api_key = os.getenv("GEMINI_API_KEY")
+    return create_analyzer(cache_dir, api_key=api_key, gemini=bool(api_key)).analyze
+
+
+def plan_command(args):
+    request = _read_request(args.request)
+    analyze = None if request.get("trainings") else _analyzer(args.cache_dir)
+    record, plan_df = build_plan(request, analyze)
+
+    _write_text(
+        args.output,
+        json.dumps(record, ensure_ascii=False, indent=2, default=str) + "\n",
+    )
+    if args.calendar:
+        from performanceplan.render import generate_calendar_html
+
+        _write_text(args.calendar, generate_calendar_html(plan_df, LEVEL_LABELS))
+    if args.chart:
+        from performanceplan.charts import create_performance_chart
+
+        create_performance_chart(plan_df).write_html(args.chart, include_plotlyjs="cdn")
+    return 0
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(
+        prog="python -m performanceplan",
+        description="Peak Performance Planner 명령줄 도구",
+    )
+    subparsers = parser.add_subparsers(dest="command", required=True)
+
+    plan_parser = subparsers.add_parser("plan", help="훈련 계획 하나를 생성합니다.")
+    plan_parser.add_argument("request", help="요청 JSON 파일 ('-'이면 표준 입력)")
+    plan_parser.add_argument(
+        "-o", "--output", default="-", help="결과 JSON 파일 ('-'이면 표준 출력)"
+    )
+    plan_parser.add_argument("--calendar", help="캘린더 HTML을 저장할 파일")
+    plan_parser.add_argument(
+        "--chart", help="퍼포먼스 차트 HTML을 저장할 파일 (plotly 필요)"
+    )
+    plan_parser.add_argument(
+        "--cache-dir", default=os.getenv("PLANNER_CACHE_DIR", ".cache")
+    )
+
+    subparsers.add_parser(
+        "batch", help="선수 명단으로 계획을 일괄 생성합니다.", add_help=False
+    )
+
+    argv = sys.argv[1:] if argv is None else list(argv)
+    if argv and argv[0] == "batch":
+        from performanceplan.batch import main as batch_main
+
+        return batch_main(argv[1:])
+
+    args = parser.parse_args(argv)
+    try:
+        return plan_command(args)
+    except (KeyError, ValueError, RuntimeError) as e:
+        parser.exit(2, f"오류: {type(e).__name__}: {e}\n")
@@ -0,0 +1,153 @@
+"""
+계획 내보내기 (CSV, Parquet, iCalendar, PNG 이미지).
+
+내보내기 파일은 계획과 형식별로 메모하며, 앱은 메모된 바이트로 다운로드 버튼을 만듭니다.
+앱은 CSV만 계획을 표시할 때 만들고, 나머지 형식은 사용자가 '준비' 버튼을 누른 경우에만 만듭니다.
+Parquet는 pyarrow가 설치된 경우에만 사용할 수 있습니다.
+"""
+
+import importlib.util
+import io
+import os
+from datetime import date, timedelta
+
+from performanceplan.cache import LRUCache
+from performanceplan.metrics import timed
+from performanceplan.planner import LEVEL_LABELS, get_intuitive_df_for_csv, plan_frame
+
+# 형식 -> (MIME 타입, 확장자)
+EXPORT_FORMATS = {
+    "csv": ("text/csv", "csv"),
+    "parquet": ("application/vnd.apache.parquet", "parquet"),
+    "ics": ("text/calendar", "ics"),
+    "png": ("image/png", "png"),
+}
+
+ICS_PRODID = "-//Peak Performance Planner//KO"
+
+_export_cache = LRUCache(max_entries=int(os.getenv("PLANNER_EXPORT_CACHE_SIZE", "64")))
+
+
+def parquet_available():
+    return importlib.util.find_spec("pyarrow") is not None
+
+
+def _ics_escape(text):
+    return (
+        str(text)
+        .replace("\\", "\\\\")
+        .replace(";", "\\;")
+        .replace(",", "\\,")
+        .replace("\n", "\\n")
+    )
+
+
+def _ics_fold(line):
+    """RFC 5545에 따라 75옥텟을 넘는 줄을 접음 (UTF-8 문자 경계 유지)"""
+    parts, current, size = [], [], 0
+    for char in line:
+        width = len(char.encode("utf-8"))
+        limit = 75 if not parts else 74  # 이어지는 줄은 앞의 공백 한 칸 포함
+        if size + width > limit:
+            parts.append("".join(current))
+            current, size = [], 0
+        current.append(char)
+        size += width
+    parts.append("".join(current))
+    return "\r\n ".join(parts) + "\r\n"
+
+
+def ics_header(calendar_name):
+    lines = [
+        "BEGIN:VCALENDAR",
+        "VERSION:2.0",
+        f"PRODID:{ICS_PRODID}",
+        "CALSCALE:GREGORIAN",
+        f"X-WR-CALNAME:{_ics_escape(calendar_name)}",
+    ]
+    return "".join(_ics_fold(line) for line in lines)
+
+
+ICS_FOOTER = "END:VCALENDAR\r\n"
+
+
+def ics_events(rows, uid_prefix, summary_prefix=""):
+    """
+    get_intuitive_df_for_csv 형식의 행마다 종일 일정(VEVENT) 하나를 만들어 순서대로 반환.
+    summary_prefix는 일정 제목 앞에 붙습니다 (예: 배치 출력의 선수 이름).
+    DTSTAMP는 계획 시작일로 고정하여 같은 계획은 항상 같은 파일이 됩니다.
+    """
+    stamp = None
+    for index, row in enumerate(rows):
+        day = date.fromisoformat(str(row["날짜"])[:10])
+        if stamp is None:
+            stamp = day.strftime("%Y%m%dT000000Z")
+        description = "\n".join(
+            [
+                f"단계: {row['단계']}",
+                f"강도: {row['강도 수준']}",
+                f"예상 퍼포먼스: {row['퍼포먼스 레벨']}",
+                str(row["상세 가이드"]),
+            ]
+        )
+        lines = [
+            "BEGIN:VEVENT",
+            f"UID:{uid_prefix}-{index}@performanceplan",
+            f"DTSTAMP:{stamp}",
+            f"DTSTART;VALUE=DATE:{day:%Y%m%d}",
+            f"DTEND;VALUE=DATE:{day + timedelta(days=1):%Y%m%d}",
+            f"SUMMARY:{_ics_escape(summary_prefix + str(row['훈련 내용']))}",
+            f"DESCRIPTION:{_ics_escape(description)}",
+            "END:VEVENT",
+        ]
+        yield "".join(_ics_fold(line) for line in lines)
+
+
+def _export_frame(plan, level_map):
+    return get_intuitive_df_for_csv(plan_frame(plan), level_map)
+
+
+def _build_export(plan, fmt, goal_name, level_map):
+    if fmt == "png":
+        from performanceplan.image import render_plan_png
+
+        return render_plan_png(plan, goal_name)
+    df = _export_frame(plan, level_map)
+    if fmt == "csv":
+        return df.to_csv(index=False).encode("utf-8-sig")
+    if fmt == "parquet":
+        if not parquet_available():
+            raise RuntimeError("Parquet 내보내기에는 pyarrow가 필요합니다.")
+        buffer = io.BytesIO()
+        df.to_parquet(buffer, index=False)
+        return buffer.getvalue()
+    if fmt == "ics":
+        parts = [ics_header(goal_name or "훈련 계획")]
+        parts.extend(ics_events(df.to_dict("records"), plan.digest[:16]))
+        parts.append(ICS_FOOTER)
+        return "".join(parts).encode("utf-8")
+    raise ValueError(f"지원하지 않는 내보내기 형식입니다: {fmt}")
+
+
+def _export_key(plan, fmt, goal_name, level_map):
+    return (plan.digest, fmt, goal_name, tuple(sorted(level_map.items())))
+
+
+def cached_export(plan, fmt, goal_name="", level_map=LEVEL_LABELS):
+    """이미 만든 내보내기 바이트 (메모에 없으면 만들지 않고 None)"""
+    return _export_cache.get(_export_key(plan, fmt, goal_name, level_map))
+
+
+def export_plan(plan, fmt, goal_name="", level_map=LEVEL_LABELS):
+    """계획을 fmt 형식의 바이트로 변환 (계획, 형식, 목표 이름별로 메모)"""
+    key = _export_key(plan, fmt, goal_name, level_map)
+    data = _export_cache.get(key)
+    if data is None:
+        with timed(f"export.{fmt}"):
+            data = _build_export(plan, fmt, goal_name, level_map)
+        _export_cache.set(key, data)
+    return data
+
+
+def export_cache_stats():
+    return _export_cache.stats()
@@ -0,0 +1,104 @@
+"""
+훈련 가이드 라이브러리.
+
+가이드 문구와 동의어는 데이터 파일(data/guides.json 또는 PLANNER_GUIDE_LIBRARY)에서
+한 번만 읽고, 모든 용어로 문자 단위 트라이를 미리 만들어 둡니다. 훈련명 조회는
+트라이를 따라가는 다중 패턴 매칭이라 라이브러리 항목 수와 관계없이 훈련명 길이에만
+비례하며, 훈련명 -> 항목 결과는 메모합니다.
+"""
+
+import functools
+import json
+import os
+import random
+
+from performanceplan.cache import LRUCache
+
+DEFAULT_LIBRARY_PATH = os.path.join(os.path.dirname(__file__), "data", "guides.json")
+
+_END = ""  # 트라이 노드에서 용어가 끝나는 위치를 표시하는 키 (값: 항목 인덱스)
+
+
+def _normalize(text):
+    # 대소문자와 띄어쓰기 차이('회복조깅'/'회복 조깅')를 무시
+    return "".join(str(text).lower().split())
+
+
+class GuideLibrary:
+    """이름, 용어(동의어), 가이드 문구 목록으로 구성된 항목들의 조회 인덱스"""
+
+    def __init__(self, entries, default, memo_size=4096):
+        self.names = []
+        self.guides = []
+        self.default = default
+        self._trie = {}
+        for index, entry in enumerate(entries):
+            self.names.append(entry["name"])
+            self.guides.append(tuple(entry["guides"]))
+            for term in [entry["name"], *entry.get("terms", [])]:
+                self._insert(_normalize(term), index)
+        self._memo = LRUCache(max_entries=memo_size)
+
+    @classmethod
+    def load(cls, path, memo_size=4096):
+        with open(path, encoding="utf-8") as f:
+            data = json.load(f)
+        return cls(data["entries"], data["default"], memo_size=memo_size)
+
+    def _insert(self, term, index):
+        if not term:
+            return
+        node = self._trie
+        for char in term:
+            node = node.setdefault(char, {})
+        # 같은 용어가 여러 항목에 있으면 파일에서 먼저 나온 항목 사용
+        node.setdefault(_END, index)
+
+    def _search(self, text):
+        """가장 긴 용어와 일치하는 항목 인덱스 (길이가 같으면 앞쪽 위치 우선)"""
+        best, best_length = None, 0
+        for start in range(len(text)):
+            node = self._trie
+            for offset in range(start, len(text)):
+                node = node.get(text[offset])
+                if node is None:
+                    break
+                length = offset - start + 1
+                if _END in node and length > best_length:
+                    best, best_length = node[_END], length
+        return best
+
+    def match(self, workout_name):
+        """훈련명과 일치하는 항목 이름 (없으면 None)"""
+        index = self._lookup(workout_name)
+        return None if index < 0 else self.names[index]
+
+    def _lookup(self, workout_name):
+        index = self._memo.get(workout_name)
+        if index is None:
+            found = self._search(_normalize(workout_name))
+            index = -1 if found is None else found
+            self._memo.set(workout_name, index)
+        return index
+
+    def guide(self, workout_name, rng=random):
+        """훈련명에 맞는 가이드 문구 하나 (rng: random.Random 인스턴스)"""
+        index = self._lookup(workout_name)
+        if index < 0:
+            return self.default
+        return rng.choice(self.guides[index])
+
+    def __len__(self):
+        return len(self.names)
+
+    def stats(self):
+        return {"entries": len(self.names), "memo": self._memo.stats()}
+
+
+@functools.lru_cache(maxsize=None)
+def default_library():
+    """앱/배치가 공유하는 가이드 라이브러리 (처음 사용할 때 한 번 로드)"""
+    return GuideLibrary.load(
+        os.getenv("PLANNER_GUIDE_LIBRARY", DEFAULT_LIBRARY_PATH),
+        memo_size=int(os.getenv("PLANNER_GUIDE_MEMO_SIZE", "4096")),
+    )
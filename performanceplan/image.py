@@ -0,0 +1,264 @@
+"""
+계획 요약 이미지(PNG)를 서버에서 Pillow로 직접 그립니다.
+
+요약, 예상 퍼포먼스 곡선, 훈련 강도 막대, 날짜별 카드를 외부 리소스 없이 렌더링하므로
+오프라인이나 엄격한 CSP 환경에서도 동작합니다. 한글 표시를 위해
+PLANNER_FONT_PATH(및 PLANNER_FONT_BOLD_PATH) 또는 시스템의 CJK 글꼴을 사용합니다.
+"""
+
+import functools
+import io
+import os
+
+import numpy as np
+from PIL import Image, ImageDraw, ImageFont
+
+from performanceplan.plan import performance_bars
+
+# (경로, TrueType Collection 인덱스) 후보. 앞에 있을수록 우선
+_REGULAR_FONTS = [
+    ("/usr/share/fonts/opentype/noto/NotoSansCJK-Regular.ttc", 1),
+    ("/usr/share/fonts/noto-cjk/NotoSansCJK-Regular.ttc", 1),
+    ("/usr/share/fonts/truetype/nanum/NanumGothic.ttf", 0),
+    ("/System/Library/Fonts/AppleSDGothicNeo.ttc", 0),
+    ("C:/Windows/Fonts/malgun.ttf", 0),
+    ("/usr/share/fonts/truetype/dejavu/DejaVuSans.ttf", 0),
+]
+_BOLD_FONTS = [
+    ("/usr/share/fonts/opentype/noto/NotoSansCJK-Bold.ttc", 1),
+    ("/usr/share/fonts/noto-cjk/NotoSansCJK-Bold.ttc", 1),
+    ("/usr/share/fonts/truetype/nanum/NanumGothicBold.ttf", 0),
+    ("/System/Library/Fonts/AppleSDGothicNeo.ttc", 6),
+    ("C:/Windows/Fonts/malgunbd.ttf", 0),
+    ("/usr/share/fonts/truetype/dejavu/DejaVuSans-Bold.ttf", 0),
+]
+
+WIDTH = 550  # 앱 본문 최대 너비와 같은 논리 픽셀
+PADDING = 24
+# 날짜별 카드 최대 개수. 긴 계획은 시합일 직전 기간의 카드만 그림
+MAX_CARDS = int(os.getenv("PLANNER_IMAGE_MAX_CARDS", "28"))
+
+INK = "#0D1628"
+MUTED = "#86929A"
+ACCENT = "#2BA7D1"
+BAR = "#EE7D8D"
+LINE = "#E8E8E8"
+GRID = "#E8E8E8"
+# 강도 구간 (레벨 1-2 / 3-4 / 5 이상)과 단계별 태그 색은 캘린더 카드와 동일
+_INTENSITY = [("매우 낮음", "#1AB27A"), ("보통", "#EB734D"), ("매우 높음", "#FF2B64")]
+_PHASE_COLORS = {"준비기": "#1AB27A", "시합기": "#EB734D"}
+
+
+@functools.lru_cache(maxsize=None)
+def _font(size, bold=False):
+    env_path = os.getenv("PLANNER_FONT_BOLD_PATH" if bold else "PLANNER_FONT_PATH")
+    candidates = [(env_path, 0)] if env_path else []
+    candidates += _BOLD_FONTS if bold else _REGULAR_FONTS
+    for path, index in candidates:
+        if path and os.path.exists(path):
+            try:
+                return ImageFont.truetype(path, size, index=index)
+            except OSError:
+                continue
+    return ImageFont.load_default(size)
+
+
+def _wrap(text, font, width):
+    """픽셀 너비에 맞춰 줄바꿈 (공백 단위, 긴 단어는 글자 단위)"""
+    lines, current = [], ""
+    for word in str(text).split(" "):
+        candidate = f"{current} {word}" if current else word
+        if font.getlength(candidate) <= width:
+            current = candidate
+            continue
+        if current:
+            lines.append(current)
+        current = ""
+        for char in word:
+            if font.getlength(current + char) > width and current:
+                lines.append(current)
+                current = ""
+            current += char
+    if current:
+        lines.append(current)
+    return lines or [""]
+
+
+class _Canvas:
+    """논리 픽셀 좌표를 scale배 해상도로 그리는 도우미"""
+
+    def __init__(self, height, scale):
+        self.scale = scale
+        self.image = Image.new("RGB", (WIDTH * scale, int(height * scale)), "white")
+        self.draw = ImageDraw.Draw(self.image)
+
+    def _xy(self, *values):
+        return [v * self.scale for v in values]
+
+    def font(self, size, bold=False):
+        return _font(size * self.scale, bold)
+
+    def text(self, x, y, text, size, fill=INK, bold=False, anchor="la"):
+        self.draw.text(
+            self._xy(x, y),
+            str(text),
+            font=self.font(size, bold),
+            fill=fill,
+            anchor=anchor,
+        )
+
+    def rect(self, x0, y0, x1, y1, radius=0, fill=None, outline=None):
+        self.draw.rounded_rectangle(
+            self._xy(x0, y0, x1, y1),
+            radius=radius * self.scale,
+            fill=fill,
+            outline=outline,
+            width=self.scale if outline else 0,
+        )
+
+    def line(self, points, fill, width=1):
+        self.draw.line(
+            [tuple(self._xy(x, y)) for x, y in points],
+            fill=fill,
+            width=width * self.scale,
+        )
+
+    def polygon(self, points, fill):
+        self.draw.polygon([tuple(self._xy(x, y)) for x, y in points], fill=fill)
+
+    def png(self):
+        # 색 수가 적은 도표 이미지이므로 팔레트로 줄여 파일 크기를 절반 이하로 줄임
+        image = self.image.quantize(128, method=Image.Quantize.FASTOCTREE)
+        buffer = io.BytesIO()
+        image.save(buffer, format="PNG", compress_level=3)
+        return buffer.getvalue()
+
+
+def _card_layout(plan, first_day, guide_font_size, inner_width):
+    """first_day부터 날짜별 (가이드 줄 목록, 카드 높이)"""
+    guide_font = _font(guide_font_size)
+    layouts = []
+    for code in plan.guide_codes[first_day:]:
+        lines = _wrap(plan.guides[code], guide_font, inner_width)
+        layouts.append((lines, 92 + 18 * len(lines)))
+    return layouts
+
+
+def _draw_performance(canvas, plan, top, height):
+    x0, x1 = PADDING + 28, WIDTH - PADDING
+    y0, y1 = top, top + height
+    values = plan.performance
+    low, high = float(values.min()), float(values.max())
+    if high - low < 1e-9:
+        low, high = low - 1, high + 1
+    margin = (high - low) * 0.1
+    low, high = low - margin, high + margin
+
+    for frac in (0.0, 0.5, 1.0):
+        y = y1 - frac * (y1 - y0)
+        canvas.line([(x0, y), (x1, y)], GRID)
+        canvas.text(
+            x0 - 6, y, f"{low + frac * (high - low):.0f}", 9, MUTED, anchor="rm"
+        )
+
+    n = len(values)
+    xs = x0 + (x1 - x0) * (np.arange(n) / max(n - 1, 1))
+    ys = y1 - (values - low) / (high - low) * (y1 - y0)
+    points = list(zip(xs.tolist(), ys.tolist()))
+    canvas.polygon([(x0, y1), *points, (x1, y1)], "#E9F6FA")
+    canvas.line(points, ACCENT, width=3)
+
+
+def _draw_intensity(canvas, plan, top, height):
+    x0, x1 = PADDING + 28, WIDTH - PADDING
+    y1 = top + height
+    n = plan.total_days
+    slot = (x1 - x0) / n
+    bar = max(slot * 0.6, 1)
+    for i, level in enumerate(plan.levels.tolist()):
+        cx = x0 + slot * (i + 0.5)
+        bar_top = y1 - height * level / 7.5
+        canvas.rect(
+            cx - bar / 2, bar_top, cx + bar / 2, y1, radius=min(bar / 2, 6), fill=BAR
+        )
+    canvas.line([(x0, y1), (x1, y1)], GRID)
+    for level in (0, 7):
+        canvas.text(x0 - 6, y1 - height * level / 7.5, level, 9, MUTED, anchor="rm")
+
+
+def render_plan_png(plan, goal_name="", scale=2):
+    """계획 요약 PNG 바이트 (scale배 해상도)"""
+    inner = WIDTH - 2 * PADDING - 24
+    first_day = max(0, plan.total_days - MAX_CARDS)
+    cards = _card_layout(plan, first_day, 12 * scale, inner * scale)
+    # 카드 안의 가이드 줄바꿈은 scale배 글꼴로 계산했으므로 줄 수만 사용
+    chart_height, bars_height = 160, 110
+    header = 96
+    sections = 3 * 40 + chart_height + bars_height + 24
+    cards_height = sum(h + 12 for _, h in cards)
+    canvas = _Canvas(header + sections + cards_height + PADDING, scale)
+
+    dates = plan.dates
+    title = f"'{goal_name or '훈련 목표'}' 최종 훈련 계획"
+    canvas.text(PADDING, PADDING, title, 20, bold=True)
+    canvas.text(
+        PADDING,
+        PADDING + 34,
+        f"{dates[0]:%Y.%m.%d} ~ {dates[-1]:%Y.%m.%d} · {plan.total_days}일"
+        f" · 시합일 예상 퍼포먼스 {plan.performance[-1]:.1f} · 시드 {plan.seed}",
+        12,
+        MUTED,
+    )
+
+    y = header
+    canvas.text(PADDING, y, "예상 퍼포먼스", 14, bold=True)
+    y += 32
+    _draw_performance(canvas, plan, y, chart_height)
+    y += chart_height + 20
+
+    canvas.text(PADDING, y, "훈련 강도", 14, bold=True)
+    y += 32
+    _draw_intensity(canvas, plan, y, bars_height)
+    y += bars_height + 28
+
+    canvas.text(PADDING, y, "상세 훈련 캘린더", 14, bold=True)
+    if first_day:
+        canvas.text(
+            WIDTH - PADDING,
+            y + 2,
+            f"시합 전 마지막 {len(cards)}일 (전체 {plan.total_days}일)",
+            11,
+            MUTED,
+            anchor="ra",
+        )
+    y += 32
+
+    phases = plan.phase_labels()
+    bars = performance_bars(plan.performance)
+    intensity = np.digitize(plan.levels, [3, 5])
+    for i, (lines, height) in enumerate(cards, start=first_day):
+        x0, x1 = PADDING, WIDTH - PADDING
+        canvas.rect(x0, y, x1, y + height, radius=16, fill="white", outline=LINE)
+        cx = x0 + 12
+        canvas.text(cx, y + 12, f"{dates[i]:%y.%m.%d (%a)}", 12, bold=True)
+        label, color = _INTENSITY[intensity[i]]
+        canvas.text(x1 - 12, y + 12, label, 11, color, bold=True, anchor="ra")
+        canvas.text(cx, y + 32, f"퍼포먼스 {bars[i]}", 11, MUTED)
+        phase = phases[i]
+        tag_width = canvas.font(11, True).getlength(phase) / scale + 16
+        canvas.rect(
+            cx,
+            y + 52,
+            cx + tag_width,
+            y + 70,
+            radius=4,
+            fill=_PHASE_COLORS.get(phase, MUTED),
+        )
+        canvas.text(cx + 8, y + 55, phase, 11, "white", bold=True)
+        name = plan.trainings[plan.training_codes[i]]
+        canvas.text(cx + tag_width + 8, y + 52, name, 15, bold=True)
+        for j, line in enumerate(lines):
+            canvas.text(cx, y + 80 + 18 * j, line, 12, MUTED)
+        y += height + 12
+
+    return canvas.png()
@@ -0,0 +1,114 @@
+"""
+키워드 사전 기반 로컬 훈련 분류기.
+
+인터벌, 지속주, 회복 조깅처럼 표준 훈련명만 나열한 설명은 Gemini 없이
+사전 매칭으로 훈련 목록과 7단계 강도를 정합니다. 설명의 각 구절이 사전 용어와
+얼마나 맞는지로 신뢰도(0~1)를 계산하며, 신뢰도가 낮으면 호출 측에서 Gemini로 넘깁니다.
+"""
+
+import re
+from typing import NamedTuple
+
+# (훈련명, 강도 레벨, 동의어). 훈련명은 가이드 라이브러리(data/guides.json) 용어를 포함하도록 정함
+TRAINING_LEXICON = [
+    ("휴식", 1, ["휴식", "완전 휴식", "수면", "명상", "rest"]),
+    ("가벼운 산책", 2, ["산책", "걷기", "walk"]),
+    ("스트레칭", 2, ["스트레칭", "요가", "stretching", "yoga"]),
+    ("회복 조깅", 2, ["회복 조깅", "회복주", "회복 달리기", "recovery run"]),
+    ("코어 운동", 3, ["코어", "플랭크", "core"]),
+    ("폼 롤링", 3, ["폼 롤링", "폼롤러", "마사지", "foam rolling"]),
+    ("기술 훈련", 3, ["기술 훈련", "드릴", "자세 교정", "drill"]),
+    ("장거리 지속주", 4, ["장거리 지속주", "장거리", "lsd", "long run"]),
+    ("이지런", 4, ["이지런", "조깅", "easy run", "jogging"]),
+    ("지구력 유산소", 4, ["유산소", "수영", "사이클", "자전거", "swim", "bike"]),
+    ("템포 지속주", 5, ["템포", "역치", "지속주", "tempo", "threshold"]),
+    ("언덕 인터벌", 6, ["언덕", "힐 트레이닝", "업힐", "hill"]),
+    ("인터벌", 6, ["인터벌", "반복주", "interval"]),
+    ("근력 운동", 6, ["근력", "웨이트", "스쿼트", "데드리프트", "strength"]),
+    ("플라이오메트릭", 6, ["플라이오메트릭", "점프 훈련", "plyometric"]),
+    ("스프린트", 7, ["스프린트", "전력 질주", "sprint"]),
+    ("기록 측정", 7, ["타임 트라이얼", "기록 측정", "모의 시합", "time trial"]),
+]
+
+# 사용자가 따로 적지 않아도 함께 넣는 표준 보조 훈련
+SUPPORTING_TRAININGS = [("스트레칭", 2), ("코어 운동", 3), ("휴식", 1)]
+# 목표에 특정 종목이 포함되면 추가하는 보조 훈련
+GOAL_SUPPORTING_TRAININGS = {
+    "마라톤": [("회복 조깅", 2)],
+    "러닝": [("회복 조깅", 2)],
+    "달리기": [("회복 조깅", 2)],
+    "철인": [("회복 조깅", 2), ("지구력 유산소", 4)],
+}
+
+# 구절 구분자 (쉼표, 문장 부호, 줄바꿈, 접속어)
+_CLAUSE_SPLIT = re.compile(r"[,.;/\n+·&]|\s(?:및|그리고|하고|and)\s")
+# 훈련 내용과 무관한 횟수/기간 표현만 남은 구절은 신뢰도 계산에서 제외
+_FILLER = re.compile(
+    r"^[\s\d]*(?:매일|매주|주말|평일|주|하루|일|회|번|분|시간|km|m|세트|x|×|[~\-()])*[\s\d]*$",
+    re.IGNORECASE,
+)
+
+# 제외/대체/부상, 부정("하지 않고"), 강도 조절("낮춰서")처럼 문맥 해석이 필요한 표현이 있으면
+# 사전 매칭을 신뢰하지 않음 (사전 강도를 그대로 쓰면 뜻이 뒤집힘)
+_NEEDS_CONTEXT = re.compile(
+    r"제외|빼고|말고|없이|대신|부상|통증|재활|금지"
+    r"|않|안 ?하|하지|낮춰|낮게|줄여|가볍게"
+)
+
+
+class LocalAnalysis(NamedTuple):
+    trainings: list
+    confidence: float
+
+
+def _term_pattern(term):
+    # '회복 조깅'과 '회복조깅'을 모두 인식하도록 공백은 선택적으로 매칭
+    return r"\s*".join(re.escape(part) for part in term.split())
+
+
+def _compile(lexicon):
+    terms = {}
+    for name, level, synonyms in lexicon:
+        for synonym in synonyms:
+            terms.setdefault(synonym.lower(), (name, level))
+    # 긴 용어를 먼저 시도하여 '회복 조깅'이 '조깅'보다 우선 매칭되도록 함
+    ordered = sorted(terms, key=len, reverse=True)
+    pattern = re.compile("|".join(_term_pattern(t) for t in ordered), re.IGNORECASE)
+    lookup = {re.sub(r"\s+", "", t): value for t, value in terms.items()}
+    return pattern, lookup
+
+
+_PATTERN, _LOOKUP = _compile(TRAINING_LEXICON)
+
+
+def classify(user_text, goal=""):
+    """설명에서 훈련 목록(사전 순서가 아닌 등장 순서)과 신뢰도를 추출"""
+    trainings, seen = [], set()
+    matched_clauses, total_clauses = 0, 0
+    for clause in _CLAUSE_SPLIT.split(str(user_text)):
+        clause = clause.strip()
+        if not clause or _FILLER.match(clause):
+            continue
+        total_clauses += 1
+        matches = _PATTERN.findall(clause)
+        if matches:
+            matched_clauses += 1
+        for term in matches:
+            name, level = _LOOKUP[re.sub(r"\s+", "", term.lower())]
+            if name not in seen:
+                seen.add(name)
+                trainings.append({"name": name, "intensity_level": level})
+
+    if not trainings:
+        return LocalAnalysis([], 0.0)
+    supporting = list(SUPPORTING_TRAININGS)
+    for keyword, extra in GOAL_SUPPORTING_TRAININGS.items():
+        if keyword in str(goal):
+            supporting.extend(extra)
+    for name, level in supporting:
+        if name not in seen:
+            seen.add(name)
+            trainings.append({"name": name, "intensity_level": level})
+    if _NEEDS_CONTEXT.search(str(user_text)):
+        return LocalAnalysis(trainings, 0.0)
+    return LocalAnalysis(trainings, matched_clauses / total_clauses)
@@ -0,0 +1,224 @@
+"""
+구간별 실행 시간 측정 레지스트리.
+
+앱 전체 재실행과 fragment 단위 재실행처럼 이름 붙인 구간의 소요 시간을 모아
+횟수, 평균, 최대값과 최근 샘플 기준 백분위수, 히스토그램 구간별 횟수를 제공합니다.
+캐시 적중률처럼 다른 모듈이 이미 집계하는 값은 수집기(register_collector)로 연결하며,
+performanceplan.prometheus가 이를 Prometheus 텍스트 형식으로 내보냅니다.
+
+PLANNER_METRICS=0이면 측정을 끄고 timed()는 아무 일도 하지 않는 컨텍스트를 반환합니다.
+PLANNER_METRICS_JSON_LOG=1이면 측정할 때마다 JSON 한 줄을 로그로 남깁니다.
+"""
+
+import bisect
+import contextlib
+import json
+import logging
+import os
+import threading
+import time
+from collections import deque
+
+logger = logging.getLogger(__name__)
+json_logger = logging.getLogger(f"{__name__}.json")
+
+# 히스토그램 구간 상한(초). 로컬 계산(ms)부터 Gemini 호출(수 초)까지 포함
+DEFAULT_BUCKETS = (
+    0.001,
+    0.0025,
+    0.005,
+    0.01,
+    0.025,
+    0.05,
+    0.1,
+    0.25,
+    0.5,
+    1.0,
+    2.5,
+    5.0,
+    10.0,
+    30.0,
+)
+
+
+class _NullTimer(contextlib.ContextDecorator):
+    """측정을 끈 경우의 timed() 결과 (with 문과 데코레이터 모두 지원)"""
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc):
+        return False
+
+
+_NULL_TIMER = _NullTimer()
+
+
+class TimingRegistry:
+    """이름별 소요 시간 통계 (스레드 안전, 최근 max_samples개로 백분위수 계산)"""
+
+    def __init__(
+        self, max_samples=1024, buckets=DEFAULT_BUCKETS, enabled=True, json_log=False
+    ):
+        self.max_samples = max_samples
+        self.buckets = tuple(buckets)
+        self.enabled = enabled
+        self.json_log = json_log
+        self._series = {}
+        self._counters = {}
+        self._lock = threading.Lock()
+
+    def observe(self, name, seconds):
+        if not self.enabled:
+            return
+        with self._lock:
+            series = self._series.get(name)
+            if series is None:
+                series = self._series[name] = {
+                    "count": 0,
+                    "total": 0.0,
+                    "max": 0.0,
+                    "samples": deque(maxlen=self.max_samples),
+                    "buckets": [0] * len(self.buckets),
+                }
+            series["count"] += 1
+            series["total"] += seconds
+            series["max"] = max(series["max"], seconds)
+            series["samples"].append(seconds)
+            index = bisect.bisect_left(self.buckets, seconds)
+            if index < len(self.buckets):
+                series["buckets"][index] += 1
+        logger.debug("%s: %.1fms", name, seconds * 1000)
+        if self.json_log:
+            json_logger.info(
+                json.dumps(
+                    {"metric": name, "seconds": round(seconds, 6), "ts": time.time()},
+                    ensure_ascii=False,
+                )
+            )
+
+    def increment(self, name, amount=1):
+        """이름별 누적 횟수 (파싱 실패처럼 시간이 없는 사건)"""
+        if not self.enabled:
+            return
+        with self._lock:
+            self._counters[name] = self._counters.get(name, 0) + amount
+
+    def time(self, name):
+        if not self.enabled:
+            return _NULL_TIMER
+        return self._time(name)
+
+    @contextlib.contextmanager
+    def _time(self, name):
+        started = time.perf_counter()
+        try:
+            yield
+        finally:
+            self.observe(name, time.perf_counter() - started)
+
+    def stats(self):
+        """{이름: {count, mean, max, p50, p95, p99}} (시간 단위: 초)"""
+        with self._lock:
+            snapshot = {
+                name: (s["count"], s["total"], s["max"], sorted(s["samples"]))
+                for name, s in self._series.items()
+            }
+        result = {}
+        for name, (count, total, peak, samples) in snapshot.items():
+            result[name] = {
+                "count": count,
+                "mean": total / count,
+                "max": peak,
+                **{f"p{q}": _percentile(samples, q) for q in (50, 95, 99)},
+            }
+        return result
+
+    def histograms(self):
+        """{이름: {count, sum, buckets: [(상한, 누적 횟수)]}} (마지막 구간 +Inf 제외)"""
+        with self._lock:
+            snapshot = {
+                name: (s["count"], s["total"], list(s["buckets"]))
+                for name, s in self._series.items()
+            }
+        result = {}
+        for name, (count, total, counts) in snapshot.items():
+            cumulative, buckets = 0, []
+            for bound, bucket_count in zip(self.buckets, counts):
+                cumulative += bucket_count
+                buckets.append((bound, cumulative))
+            result[name] = {"count": count, "sum": total, "buckets": buckets}
+        return result
+
+    def counters(self):
+        with self._lock:
+            return dict(self._counters)
+
+    def reset(self):
+        with self._lock:
+            self._series.clear()
+            self._counters.clear()
+
+
+def _percentile(sorted_samples, q):
+    index = min(len(sorted_samples) - 1, int(len(sorted_samples) * q / 100))
+    return sorted_samples[index]
+
+
+def _json_log_enabled():
+    if os.getenv("PLANNER_METRICS_JSON_LOG") != "1":
+        return False
+    # 앱 로그 설정과 관계없이 한 줄에 JSON 하나만 출력
+    if not json_logger.handlers:
+        handler = logging.StreamHandler()
+        handler.setFormatter(logging.Formatter("%(message)s"))
+        json_logger.addHandler(handler)
+        json_logger.setLevel(logging.INFO)
+        json_logger.propagate = False
+    return True
+
+
+registry = TimingRegistry(
+    enabled=os.getenv("PLANNER_METRICS", "1") != "0",
+    json_log=_json_log_enabled(),
+)
+
+# 이름 -> 통계 dict를 반환하는 함수 (캐시/분석기 등의 stats())
+_collectors = {}
+_collectors_lock = threading.Lock()
+
+
+def timed(name):
+    """with 문 또는 데코레이터로 구간 시간을 기본 레지스트리에 기록"""
+    return registry.time(name)
+
+
+def observe(name, seconds):
+    registry.observe(name, seconds)
+
+
+def increment(name, amount=1):
+    registry.increment(name, amount)
+
+
+def timing_stats():
+    return registry.stats()
+
+
+def register_collector(name, collect):
+    """collect()가 반환하는 (중첩) dict의 숫자 값을 name 아래 지표로 내보냄"""
+    with _collectors_lock:
+        _collectors[name] = collect
+
+
+def collect():
+    """등록된 수집기 결과 {이름: dict}. 실패한 수집기는 건너뜀"""
+    with _collectors_lock:
+        collectors = list(_collectors.items())
+    result = {}
+    for name, collect_fn in collectors:
+        try:
+            result[name] = collect_fn()
+        except Exception:  # noqa: BLE001 - 지표 수집 실패가 응답을 막지 않도록
+            logger.exception("지표 수집 실패: %s", name)
+    return result
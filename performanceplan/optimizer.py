@@ -0,0 +1,139 @@
+"""
+시합일(D-day) 예상 퍼포먼스를 최대화하는 강도 스케줄 최적화.
+
+피트니스/피로 점화식은 선형이므로 마지막 날의 퍼포먼스는 일별 기여도의 합
+(초기값 항 + Σ 일별 부하 × 남은 일수에 따른 감쇠 가중치)으로 분해됩니다.
+따라서 (날짜, 연속 훈련일) 상태만으로 정확한 동적 계획법을 풀 수 있으며,
+피트니스/피로 값을 이산화할 필요가 없습니다.
+"""
+
+import time
+
+import numpy as np
+
+from performanceplan.engine import (
+    ADAPTATION_SCALE,
+    FATIGUE_DECAY,
+    FITNESS_DECAY,
+    LEVEL_ADAPTATION,
+    simulate,
+    training_stress,
+)
+from performanceplan.planner import (
+    PHASE_RULES,
+    TAPER_FIXED_LEVELS,
+    TAPER_FREE_LEVELS,
+    phase_schedule,
+)
+
+
+def day_weights(total_days, taper):
+    """
+    (total_days, 8) 배열: 각 날짜에 각 레벨을 수행했을 때
+    마지막 날 퍼포먼스(피트니스 - 피로)에 더해지는 기여도
+    """
+    lag = total_days - 1 - np.arange(total_days)
+    levels = np.arange(len(LEVEL_ADAPTATION))[None, :]
+    stress = training_stress(levels, taper=np.asarray(taper)[:, None])
+    gain = stress * LEVEL_ADAPTATION[levels] * ADAPTATION_SCALE
+    return gain * (FITNESS_DECAY**lag)[:, None] - stress * (FATIGUE_DECAY**lag)[:, None]
+
+
+def _best_level(weights, candidates):
+    candidates = list(dict.fromkeys(candidates))
+    if not candidates:
+        return None
+    return max(candidates, key=lambda level: weights[level])
+
+
+def optimize_schedule(
+    total_days,
+    allowed_levels=None,
+    time_budget=None,
+    memory_budget=64 * 1024 * 1024,
+):
+    """
+    draw_schedule이 만들 수 있는 스케줄 중 마지막 날 퍼포먼스가 최대인 것을 찾습니다.
+    - 마지막 TAPER_DAYS일은 테이퍼링 규칙(고정 강도 / 자유일은 낮은 강도)을 따르고,
+    - 준비기/시합기에는 연속 훈련일이 해당 단계 연속 훈련일 상한 후보의 최소값 이상이어야
+      회복일을 둘 수 있으며 최대값을 넘길 수 없습니다.
+    allowed_levels가 주어지면 자유롭게 고르는 날의 강도를 그 레벨로 제한합니다.
+    time_budget(초)이나 memory_budget(바이트)을 넘으면 각각
+    TimeoutError / MemoryError가 발생합니다.
+    (단계 목록, 레벨 배열, 마지막 날 예상 퍼포먼스)를 반환합니다.
+    """
+    deadline = time.perf_counter() + time_budget if time_budget else None
+    n_states = max(max(limits) for _, _, limits in PHASE_RULES.values()) + 1
+    # 역추적 테이블: 날짜별/상태별 (이전 상태, 선택 레벨) int8 두 개
+    table_bytes = total_days * n_states * 2
+    if memory_budget is not None and table_bytes > memory_budget:
+        raise MemoryError(
+            f"최적화에 필요한 메모리({table_bytes} bytes)가 한도를 초과합니다."
+        )
+
+    allowed = set(allowed_levels) if allowed_levels is not None else None
+
+    def restrict(candidates):
+        if allowed is None:
+            return candidates
+        return [level for level in candidates if level in allowed]
+
+    phases = phase_schedule(total_days)
+    remaining = total_days - np.arange(total_days)
+    taper = np.array([phase == "테이퍼링" for phase in phases], dtype=bool)
+    weights = day_weights(total_days, taper)
+
+    score = np.full(n_states, -np.inf)
+    score[0] = 0.0
+    prev_state = np.zeros((total_days, n_states), dtype=np.int8)
+    chosen = np.zeros((total_days, n_states), dtype=np.int8)
+
+    for day in range(total_days):
+        if deadline is not None and time.perf_counter() > deadline:
+            raise TimeoutError("스케줄 최적화 시간 한도를 초과했습니다.")
+        w = weights[day]
+        new_score = np.full(n_states, -np.inf)
+
+        if taper[day]:
+            fixed = TAPER_FIXED_LEVELS.get(int(remaining[day]))
+            level = (
+                fixed
+                if fixed is not None
+                else _best_level(w, restrict(TAPER_FREE_LEVELS))
+            )
+            if level is None:
+                raise ValueError("테이퍼링 기간에 사용할 수 있는 강도 레벨이 없습니다.")
+            best = int(np.argmax(score))
+            new_score[0] = score[best] + w[level]
+            prev_state[day, 0] = best
+            chosen[day, 0] = level
+        else:
+            training_levels, recovery_levels, streak_limits = PHASE_RULES[phases[day]]
+            min_streak, max_streak = min(streak_limits), max(streak_limits)
+            train_level = _best_level(w, restrict(training_levels))
+            rest_level = _best_level(w, restrict(recovery_levels))
+            if train_level is not None:
+                for s in range(max_streak):
+                    new_score[s + 1] = score[s] + w[train_level]
+                    prev_state[day, s + 1] = s
+                    chosen[day, s + 1] = train_level
+            if rest_level is not None:
+                resting = score[min_streak:]
+                if resting.size and np.isfinite(resting).any():
+                    best = min_streak + int(np.argmax(resting))
+                    new_score[0] = score[best] + w[rest_level]
+                    prev_state[day, 0] = best
+                    chosen[day, 0] = rest_level
+        score = new_score
+
+    state = int(np.argmax(score))
+    if not np.isfinite(score[state]):
+        raise ValueError("제약 조건을 만족하는 스케줄이 없습니다.")
+
+    levels = np.empty(total_days, dtype=np.int64)
+    for day in range(total_days - 1, -1, -1):
+        levels[day] = chosen[day, state]
+        state = prev_state[day, state]
+
+    final = float(simulate(levels, taper=taper).performance[-1])
+    return phases, levels, final
@@ -0,0 +1,223 @@
+"""
+세션과 캐시에 보관하는 압축된 계획 표현.
+
+날짜는 기준일 + 일수 오프셋, 레벨/퍼포먼스는 NumPy 배열, 단계/훈련명/가이드는
+범주 코드 + 고유값 튜플로 저장합니다. 캐시된 계획을 여러 세션이 공유하므로 배열은
+모두 읽기 전용입니다. 한글 열 이름을 가진 DataFrame은 화면 표시나 내보내기 직전에
+to_frame()으로만 만듭니다.
+"""
+
+import hashlib
+import sys
+from datetime import date, timedelta
+from typing import NamedTuple, Optional
+
+import numpy as np
+
+# 퍼포먼스 막대 문자열 (채워진 칸 수 0~10)
+_PERFORMANCE_BARS = np.array(
+    ["■" * n + "□" * (10 - n) for n in range(11)], dtype=object
+)
+
+
+def _frozen(values, dtype):
+    """읽기 전용 복사본"""
+    array = np.array(values, dtype=dtype)
+    array.setflags(write=False)
+    return array
+
+
+def _code_array(codes, n_categories):
+    return _frozen(codes, np.int8 if n_categories <= 127 else np.int32)
+
+
+def _encode(values):
+    """값 목록을 (코드 배열, 등장 순서대로의 고유값 튜플)로 변환"""
+    categories = {}
+    codes = [categories.setdefault(value, len(categories)) for value in values]
+    return _code_array(codes, len(categories)), tuple(categories)
+
+
+def _digest(*parts):
+    digest = hashlib.sha256()
+    for part in parts:
+        if isinstance(part, np.ndarray):
+            digest.update(part.tobytes())
+        else:
+            digest.update(repr(part).encode("utf-8"))
+    return digest.hexdigest()
+
+
+def performance_bars(performance):
+    """예상 퍼포먼스를 계획 내 최소~최대 기준 10칸 막대(■□) 문자열 배열로 변환"""
+    performance = np.asarray(performance, dtype=np.float64)
+    min_perf, max_perf = performance.min(), performance.max()
+    if max_perf - min_perf > 0:
+        normalized = (performance - min_perf) / (max_perf - min_perf) * 100
+    else:
+        normalized = np.full(performance.shape, 50.0)
+    return _PERFORMANCE_BARS[(normalized / 10).astype(np.intp)]
+
+
+class Plan(NamedTuple):
+    start: date
+    offsets: np.ndarray  # int16, 기준일로부터의 일수
+    levels: np.ndarray  # int8, 훈련 강도 레벨
+    performance: np.ndarray  # float64, 예상 퍼포먼스 (소수 첫째 자리)
+    phase_codes: np.ndarray
+    phases: tuple
+    training_codes: np.ndarray
+    trainings: tuple
+    guide_codes: np.ndarray
+    guides: tuple
+    seed: Optional[int]
+    digest: str
+
+    @classmethod
+    def build(
+        cls, start, offsets, levels, performance, phases, trainings, guides, seed
+    ):
+        """
+        일별 값 목록으로 Plan 생성 (문자열 열은 범주 코드로 압축).
+        배열은 읽기 전용 복사본이므로 수정하려면 .copy()로 복사하세요.
+        """
+        offsets = _frozen(offsets, np.int16)
+        levels = _frozen(levels, np.int8)
+        performance = _frozen(performance, np.float64)
+        phase_codes, phase_values = _encode(phases)
+        training_codes, training_values = _encode(trainings)
+        guide_codes, guide_values = _encode(guides)
+        digest = _digest(
+            start,
+            offsets,
+            levels,
+            performance,
+            phase_codes,
+            phase_values,
+            training_codes,
+            training_values,
+            guide_codes,
+            guide_values,
+        )
+        return cls(
+            start,
+            offsets,
+            levels,
+            performance,
+            phase_codes,
+            phase_values,
+            training_codes,
+            training_values,
+            guide_codes,
+            guide_values,
+            seed,
+            digest,
+        )
+
+    @classmethod
+    def from_frame(cls, df):
+        """generate_dynamic_plan 형식의 DataFrame을 Plan으로 변환"""
+        dates = [date.fromisoformat(str(d)[:10]) for d in df["날짜"]]
+        start = dates[0]
+        return cls.build(
+            start,
+            [(d - start).days for d in dates],
+            df["훈련 강도 레벨"].to_numpy(),
+            df["예상 퍼포먼스"].to_numpy(),
+            df["단계"].tolist(),
+            df["훈련 내용"].tolist(),
+            df["상세 가이드"].tolist(),
+            df.attrs.get("seed"),
+        )
+
+    def to_dict(self):
+        """JSON 직렬화 가능한 딕셔너리 (from_dict로 복원)"""
+        return {
+            "start": self.start.isoformat(),
+            "offsets": self.offsets.tolist(),
+            "levels": self.levels.tolist(),
+            "performance": self.performance.tolist(),
+            "phase_codes": self.phase_codes.tolist(),
+            "phases": list(self.phases),
+            "training_codes": self.training_codes.tolist(),
+            "trainings": list(self.trainings),
+            "guide_codes": self.guide_codes.tolist(),
+            "guides": list(self.guides),
+            "seed": self.seed,
+            "digest": self.digest,
+        }
+
+    @classmethod
+    def from_dict(cls, data):
+        phases = tuple(data["phases"])
+        trainings = tuple(data["trainings"])
+        guides = tuple(data["guides"])
+        return cls(
+            date.fromisoformat(data["start"]),
+            _frozen(data["offsets"], np.int16),
+            _frozen(data["levels"], np.int8),
+            _frozen(data["performance"], np.float64),
+            _code_array(data["phase_codes"], len(phases)),
+            phases,
+            _code_array(data["training_codes"], len(trainings)),
+            trainings,
+            _code_array(data["guide_codes"], len(guides)),
+            guides,
+            data["seed"],
+            data["digest"],
+        )
+
+    @property
+    def total_days(self):
+        return len(self.levels)
+
+    @property
+    def dates(self):
+        return [self.start + timedelta(days=int(offset)) for offset in self.offsets]
+
+    def phase_labels(self):
+        return np.array(self.phases, dtype=object)[self.phase_codes]
+
+    def to_frame(self, performance_levels=False):
+        """
+        표시/내보내기용 DataFrame 생성 (generate_dynamic_plan 결과와 같은 열과 값).
+        performance_levels=True이면 '퍼포먼스 레벨' 막대 열을 추가합니다.
+        """
+        import pandas as pd
+
+        dates = pd.DatetimeIndex(self.dates)
+        df = pd.DataFrame(
+            {
+                "날짜": dates.strftime("%Y-%m-%d"),
+                "요일": dates.strftime("%a"),
+                "단계": self.phase_labels(),
+                "훈련 내용": np.array(self.trainings, dtype=object)[
+                    self.training_codes
+                ],
+                "훈련 강도 레벨": self.levels.astype(np.int64),
+                "예상 퍼포먼스": self.performance,
+                "상세 가이드": np.array(self.guides, dtype=object)[self.guide_codes],
+            }
+        )
+        if performance_levels:
+            df["퍼포먼스 레벨"] = performance_bars(self.performance)
+        df.attrs["seed"] = self.seed
+        return df
+
+    @property
+    def nbytes(self):
+        """배열과 범주 문자열이 차지하는 대략적인 메모리 (바이트)"""
+        arrays = (
+            self.offsets,
+            self.levels,
+            self.performance,
+            self.phase_codes,
+            self.training_codes,
+            self.guide_codes,
+        )
+        strings = (*self.phases, *self.trainings, *self.guides, self.digest)
+        return (
+            sys.getsizeof(self)
+            + sum(sys.getsizeof(a) for a in arrays)
+            + sum(sys.getsizeof(s) for s in strings)
+        )
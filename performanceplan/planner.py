@@ -0,0 +1,508 @@
+"""
+훈련 계획 생성 로직 (7단계 강도 시스템).
+
+Streamlit/Plotly 없이 사용할 수 있는 핵심 모듈입니다. NumPy/pandas와 계산 엔진은
+실제로 계획을 계산하는 함수 안에서 처음 import 하므로 모듈 import 자체는 가볍습니다.
+"""
+
+import hashlib
+import os
+import random
+import secrets
+
+from performanceplan.cache import LRUCache, make_cache_key
+from performanceplan.metrics import timed
+
+# 화면과 내보내기에서 사용하는 강도 레벨 설명
+LEVEL_LABELS = {
+    1: "Lvl 1: 완전 휴식 🟢",
+    2: "Lvl 2: 가벼운 회복 🔵",
+    3: "Lvl 3: 기술 훈련 🟡",
+    4: "Lvl 4: 지구력 훈련 🟠",
+    5: "Lvl 5: 템포 훈련 🔴",
+    6: "Lvl 6: 고강도 인터벌 🟣",
+    7: "Lvl 7: 최대 강도 🔥",
+}
+# 계획 가능한 최대 기간(일): 준비기-시합기-테이퍼링 매크로사이클 최대 12개월
+MAX_PLAN_DAYS = 365
+
+# 시합 전 테이퍼링 기간(일)과 남은 일수별 고정 강도
+TAPER_DAYS = 10
+TAPER_FIXED_LEVELS = {1: 1, 2: 2, 3: 3, 4: 2, 5: 6}
+# 무작위로 고르는 강도 후보 (테이퍼링 자유일 / 시합기 훈련일 / 시합기 회복일)
+TAPER_FREE_LEVELS = [2, 3]
+TRAINING_LEVELS = [6, 5, 4]
+RECOVERY_LEVELS = [2, 2, 3]
+# 시합기 연속 훈련일 상한 후보 (매일 무작위 선택)
+STREAK_LIMITS = [2, 3]
+
+# 시합기 길이: 테이퍼링 전 최소 11일, 긴 계획에서는 전체 기간의 25%.
+# 21일 이하 계획은 준비기 없이 시합기 + 테이퍼링만으로 구성됩니다.
+COMPETITION_MIN_DAYS = 11
+COMPETITION_SHARE = 0.25
+# 준비기: 강도는 낮추고 연속 훈련일을 늘린 기초 체력 구간
+PREP_TRAINING_LEVELS = [4, 4, 5, 3]
+PREP_RECOVERY_LEVELS = [2, 2, 1]
+PREP_STREAK_LIMITS = [3, 4]
+
+# 앙상블 시뮬레이션 한 번에 계산하는 (스케줄 수 x 일수) 상한
+ENSEMBLE_CHUNK_CELLS = int(os.getenv("PLANNER_ENSEMBLE_CHUNK_CELLS", "1000000"))
+
+# 단계별 (훈련일 강도 후보, 회복일 강도 후보, 연속 훈련일 상한 후보)
+PHASE_RULES = {
+    "준비기": (PREP_TRAINING_LEVELS, PREP_RECOVERY_LEVELS, PREP_STREAK_LIMITS),
+    "시합기": (TRAINING_LEVELS, RECOVERY_LEVELS, STREAK_LIMITS),
+}
+
+
+def validate_period(start_day, end_day):
+    """계획 기간을 검사하고 잘못된 경우 ValueError 발생"""
+    if start_day >= end_day:
+        raise ValueError("훈련 시작일은 목표일보다 이전이어야 합니다.")
+    if (end_day - start_day).days > MAX_PLAN_DAYS - 1:
+        raise ValueError(f"훈련 기간은 최대 {MAX_PLAN_DAYS}일을 초과할 수 없습니다.")
+
+
+def get_trainings_by_level(training_list):
+    """훈련 목록을 1-7 레벨별로 분류하는 함수"""
+    trainings = {level: [] for level in range(1, 8)}
+    for t in training_list:
+        level = t.get("intensity_level")
+        if level in trainings:
+            trainings[level].append(t["name"])
+
+    level_defaults = {
+        1: "완전 휴식",
+        2: "가벼운 회복",
+        3: "기술 훈련",
+        4: "지구력 훈련",
+        5: "템포 훈련",
+        6: "고강도 인터벌",
+        7: "최대 강도",
+    }
+    for level, default_name in level_defaults.items():
+        if not trainings[level]:
+            trainings[level] = [default_name]
+    return trainings
+
+
+def analyzed_levels(training_list):
+    """분석된 훈련 목록에 실제로 있는 강도 레벨 (기본 이름을 채우기 전, 오름차순)"""
+    return sorted({t.get("intensity_level") for t in training_list} & set(range(1, 8)))
+
+
+def get_detailed_guide(workout_name, rng=random):
+    """
+    훈련 종류에 따라 상세하고 다양한 가이드를 반환 (rng: random.Random 인스턴스).
+    가이드 라이브러리에서 훈련명에 포함된 가장 긴 용어의 항목을 찾습니다.
+    """
+    from performanceplan.guides import default_library
+
+    return default_library().guide(workout_name, rng)
+
+
+def phase_schedule(total_days):
+    """일별 단계 이름 목록 (준비기 -> 시합기 -> 마지막 TAPER_DAYS일 테이퍼링)"""
+    taper_days = min(TAPER_DAYS, total_days)
+    competition_days = min(
+        total_days - taper_days,
+        max(COMPETITION_MIN_DAYS, int(total_days * COMPETITION_SHARE)),
+    )
+    prep_days = total_days - taper_days - competition_days
+    return (
+        ["준비기"] * prep_days
+        + ["시합기"] * competition_days
+        + ["테이퍼링"] * taper_days
+    )
+
+
+def draw_schedule(total_days, rng=random):
+    """일별 훈련 단계와 강도 레벨을 무작위 규칙에 따라 결정 (rng: random.Random 인스턴스)"""
+    phases = phase_schedule(total_days)
+    levels = []
+    consecutive_training_days = 0
+
+    for i, phase in enumerate(phases):
+        remaining_days = total_days - i
+
+        workout_level = 1
+        if phase == "테이퍼링":
+            if remaining_days in TAPER_FIXED_LEVELS:
+                workout_level = TAPER_FIXED_LEVELS[remaining_days]
+            else:
+                workout_level = rng.choice(TAPER_FREE_LEVELS)
+            consecutive_training_days = 0
+        else:  # 준비기 / 시합기: 연속 훈련일 상한에 도달하면 회복일
+            training_levels, recovery_levels, streak_limits = PHASE_RULES[phase]
+            if consecutive_training_days < rng.choice(streak_limits):
+                consecutive_training_days += 1
+                workout_level = rng.choice(training_levels)
+            else:
+                workout_level = rng.choice(recovery_levels)
+                consecutive_training_days = 0
+
+        levels.append(workout_level)
+    return phases, levels
+
+
+def sample_schedules(total_days, n_samples, rng=None):
+    """
+    draw_schedule과 같은 규칙으로 n_samples개의 강도 시퀀스를 한 번에 샘플링.
+    (n_samples, total_days) 레벨 배열과 테이퍼링 여부 (total_days,) 배열을 반환합니다.
+    """
+    import numpy as np
+
+    rng = rng if rng is not None else np.random.default_rng()
+    phases = phase_schedule(total_days)
+    levels = np.empty((n_samples, total_days), dtype=np.int8)
+    remaining = total_days - np.arange(total_days)
+    taper = np.array([phase == "테이퍼링" for phase in phases], dtype=bool)
+    streak = np.zeros(n_samples, dtype=np.int64)
+
+    for i, phase in enumerate(phases):
+        if taper[i]:
+            fixed = TAPER_FIXED_LEVELS.get(int(remaining[i]))
+            if fixed is not None:
+                levels[:, i] = fixed
+            else:
+                levels[:, i] = rng.choice(TAPER_FREE_LEVELS, size=n_samples)
+            streak[:] = 0
+        else:
+            training_levels, recovery_levels, streak_limits = PHASE_RULES[phase]
+            train = streak < rng.choice(streak_limits, size=n_samples)
+            levels[:, i] = np.where(
+                train,
+                rng.choice(training_levels, size=n_samples),
+                rng.choice(recovery_levels, size=n_samples),
+            )
+            streak = np.where(train, streak + 1, 0)
+    return levels, taper
+
+
+@timed("plan.ensemble")
+def plan_ensemble(total_days, n_samples=10000, percentiles=(10, 50, 90), rng=None):
+    """
+    무작위 스케줄 n_samples개를 동시에 시뮬레이션하여 일별 예상 퍼포먼스 분위수를 계산.
+    {"P10": 배열, "P50": 배열, "P90": 배열} 형태로 반환합니다.
+    긴 계획은 (스케줄 수 x 일수)가 ENSEMBLE_CHUNK_CELLS를 넘지 않도록 나눠 시뮬레이션하여
+    중간 배열의 메모리를 제한합니다.
+    """
+    import numpy as np
+
+    from performanceplan.engine import simulate
+
+    rng = rng if rng is not None else np.random.default_rng()
+    chunk = max(1, ENSEMBLE_CHUNK_CELLS // max(total_days, 1))
+    performance = np.empty((n_samples, total_days), dtype=np.float64)
+    for start in range(0, n_samples, chunk):
+        end = min(n_samples, start + chunk)
+        levels, taper = sample_schedules(total_days, end - start, rng)
+        performance[start:end] = simulate(levels, taper=taper).performance
+    bands = np.percentile(performance, percentiles, axis=0)
+    return {f"P{p}": np.round(band, 1) for p, band in zip(percentiles, bands)}
+
+
+@timed("plan.generate")
+def _dynamic_plan_columns(total_days, trainings, schedule, rng):
+    """(단계 배열, 레벨 배열, 예상 퍼포먼스, 훈련명 목록, 가이드 목록)"""
+    import numpy as np
+
+    from performanceplan.engine import simulate
+
+    if schedule is None:
+        schedule = draw_schedule(total_days, rng)
+    phases, levels = schedule
+
+    # 피트니스/피로 점화식은 전체 기간을 한 번에 벡터 연산으로 계산
+    phase_array = np.array(phases)
+    level_array = np.array(levels, dtype=np.int64)
+    simulation = simulate(level_array, taper=phase_array == "테이퍼링")
+
+    workout_names = [rng.choice(trainings[level]) for level in level_array]
+    guides = [get_detailed_guide(name, rng) for name in workout_names]
+    performance = np.round(simulation.performance, 1)
+    return phase_array, level_array, performance, workout_names, guides
+
+
+def generate_dynamic_plan(total_days, date_range, trainings, schedule=None, rng=random):
+    """
+    schedule=(단계 목록, 레벨 목록)이 주어지면 무작위 스케줄 대신 사용.
+    rng(random.Random)를 넘기면 훈련명/가이드 선택까지 해당 인스턴스만 사용합니다.
+    """
+    import pandas as pd
+
+    phases, levels, performance, workout_names, guides = _dynamic_plan_columns(
+        total_days, trainings, schedule, rng
+    )
+    return pd.DataFrame(
+        {
+            "날짜": date_range.strftime("%Y-%m-%d"),
+            "요일": date_range.strftime("%a"),
+            "단계": phases,
+            "훈련 내용": workout_names,
+            "훈련 강도 레벨": levels,
+            "예상 퍼포먼스": performance,
+            "상세 가이드": guides,
+        }
+    )
+
+
+# 입력이 같은 계획을 다시 계산하지 않도록 프로세스 전체에서 공유하는 메모
+_plan_cache = LRUCache(max_entries=int(os.getenv("PLANNER_PLAN_CACHE_SIZE", "256")))
+_ensemble_cache = LRUCache(max_entries=int(os.getenv("PLANNER_PLAN_CACHE_SIZE", "256")))
+# 화면 표시 경계에서 만든 DataFrame은 소수만 보관 (세션에는 압축된 Plan만 저장)
+_frame_cache = LRUCache(max_entries=int(os.getenv("PLANNER_FRAME_CACHE_SIZE", "32")))
+# 계획별 일별 피트니스/피로 체크포인트 (일정 수정 시 수정일부터만 다시 계산)
+_state_cache = LRUCache(max_entries=int(os.getenv("PLANNER_PLAN_CACHE_SIZE", "256")))
+
+
+def new_seed():
+    """계획마다 부여하는 재현용 시드"""
+    return secrets.randbits(32)
+
+
+def _trainings_key(trainings):
+    return {str(level): list(names) for level, names in sorted(trainings.items())}
+
+
+def generate_compact_plan(
+    start_day,
+    end_day,
+    trainings,
+    seed=None,
+    optimize=False,
+    time_budget=None,
+    allowed_levels=None,
+):
+    """
+    시작일~종료일 계획을 압축된 Plan으로 생성 (Plan.seed에 시드 기록).
+    (기간, 레벨별 훈련, 시드, 모델 파라미터, 최적화 여부)가 같으면 캐시된 동일 계획을
+    반환합니다. optimize=True이면 시합일 최적화 스케줄을 사용하며,
+    최적화 실패 시 optimize_schedule의 예외가 그대로 전달됩니다.
+    allowed_levels는 최적화 스케줄에서 자유롭게 고르는 날의 강도 후보입니다.
+    trainings는 빈 레벨이 기본 이름으로 채워져 있으므로 analyzed_levels(훈련 목록)을
+    넘기세요 (None이면 제한 없음).
+    """
+    from performanceplan.engine import MODEL_PARAMS
+    from performanceplan.plan import Plan
+
+    seed = new_seed() if seed is None else int(seed)
+    key = make_cache_key(
+        "plan",
+        str(start_day),
+        str(end_day),
+        _trainings_key(trainings),
+        seed,
+        bool(optimize),
+        sorted(allowed_levels) if optimize and allowed_levels is not None else None,
+        MODEL_PARAMS,
+    )
+    cached = _plan_cache.get(key)
+    if cached is not None:
+        return cached
+
+    total_days = (end_day - start_day).days + 1
+    schedule = None
+    if optimize:
+        # optimizer가 이 모듈의 스케줄 규칙을 import 하므로 순환 import를 피해 지연 import
+        from performanceplan.optimizer import optimize_schedule
+
+        with timed("plan.optimize"):
+            phases, levels, _ = optimize_schedule(
+                total_days,
+                allowed_levels=allowed_levels,
+                time_budget=time_budget,
+            )
+        schedule = (phases, levels)
+
+    phases, levels, performance, workout_names, guides = _dynamic_plan_columns(
+        total_days, trainings, schedule, random.Random(seed)
+    )
+    plan = Plan.build(
+        start_day,
+        range(total_days),
+        levels,
+        performance,
+        phases.tolist(),
+        workout_names,
+        guides,
+        seed,
+    )
+    _plan_cache.set(key, plan)
+    return plan
+
+
+def generate_plan(
+    start_day,
+    end_day,
+    trainings,
+    seed=None,
+    optimize=False,
+    time_budget=None,
+    allowed_levels=None,
+):
+    """generate_compact_plan 결과를 DataFrame으로 반환 (DataFrame.attrs["seed"]에 시드)"""
+    return generate_compact_plan(
+        start_day, end_day, trainings, seed, optimize, time_budget, allowed_levels
+    ).to_frame()
+
+
+def plan_frame(plan):
+    """
+    표시용 DataFrame ('퍼포먼스 레벨' 포함). 최근 계획의 결과는 메모되어
+    여러 세션과 재실행이 공유하므로 반환된 DataFrame을 수정하지 마세요.
+    """
+    df = _frame_cache.get(plan.digest)
+    if df is None:
+        df = plan.to_frame(performance_levels=True)
+        _frame_cache.set(plan.digest, df)
+    return df
+
+
+def cached_plan_ensemble(total_days, n_samples, seed):
+    """시드별로 메모된 plan_ensemble 결과 (같은 시드는 항상 같은 분위수)"""
+    import numpy as np
+
+    from performanceplan.engine import MODEL_PARAMS
+
+    key = make_cache_key("ensemble", total_days, n_samples, seed, MODEL_PARAMS)
+    band = _ensemble_cache.get(key)
+    if band is None:
+        band = plan_ensemble(total_days, n_samples, rng=np.random.default_rng(seed))
+        _ensemble_cache.set(key, band)
+    return band
+
+
+def plan_state(plan):
+    """일별 (피트니스, 피로) 체크포인트 배열. 계획별로 메모"""
+    from performanceplan.engine import simulate
+
+    state = _state_cache.get(plan.digest)
+    if state is None:
+        simulation = simulate(plan.levels, taper=plan.phase_labels() == "테이퍼링")
+        state = (simulation.fitness, simulation.fatigue)
+        _state_cache.set(plan.digest, state)
+    return state
+
+
+def plan_trainings_by_level(plan):
+    """계획에 쓰인 훈련명을 레벨별로 정리 (등장 순서, 없는 레벨은 기본 이름)"""
+    pairs = dict.fromkeys(
+        zip(
+            plan.levels.tolist(),
+            (plan.trainings[code] for code in plan.training_codes.tolist()),
+        )
+    )
+    return get_trainings_by_level(
+        [{"name": name, "intensity_level": level} for level, name in pairs]
+    )
+
+
+@timed("plan.edit")
+def edit_plan_day(plan, day, level, workout_name=None):
+    """
+    day번째 날(0부터)의 강도와 훈련을 바꾼 새 Plan을 반환.
+    day 전날의 피트니스/피로 체크포인트에서 시작해 day 이후만 다시 시뮬레이션하며,
+    새 계획의 체크포인트도 함께 메모하므로 연속 수정도 수정일 이후만 계산합니다.
+    workout_name을 생략하면 계획에서 같은 레벨에 쓰인 훈련명을 사용합니다.
+    """
+    import numpy as np
+
+    from performanceplan.engine import INITIAL_FATIGUE, INITIAL_FITNESS, simulate
+    from performanceplan.plan import Plan
+
+    if not 0 <= day < plan.total_days:
+        raise ValueError(f"수정할 날짜가 계획 기간을 벗어났습니다: {day}")
+    if level not in LEVEL_LABELS:
+        raise ValueError(f"강도 레벨은 1-7 사이여야 합니다: {level}")
+    workout_name = (workout_name or "").strip() or (
+        plan_trainings_by_level(plan)[level][0]
+    )
+
+    fitness, fatigue = plan_state(plan)
+    phases = plan.phase_labels()
+    levels = plan.levels.copy()
+    levels[day] = level
+    if day:
+        fitness0, fatigue0 = fitness[day - 1], fatigue[day - 1]
+    else:
+        fitness0, fatigue0 = INITIAL_FITNESS, INITIAL_FATIGUE
+    tail = simulate(
+        levels[day:],
+        taper=phases[day:] == "테이퍼링",
+        fitness0=fitness0,
+        fatigue0=fatigue0,
+    )
+    performance = plan.performance.copy()
+    performance[day:] = np.round(tail.performance, 1)
+
+    names = [plan.trainings[code] for code in plan.training_codes.tolist()]
+    guides = [plan.guides[code] for code in plan.guide_codes.tolist()]
+    names[day] = workout_name
+    # 같은 계획/날짜/훈련명에는 항상 같은 가이드 문구
+    guides[day] = get_detailed_guide(
+        workout_name, random.Random(f"{plan.seed}:{day}:{workout_name}")
+    )
+    edited = Plan.build(
+        plan.start,
+        plan.offsets,
+        levels,
+        performance,
+        phases.tolist(),
+        names,
+        guides,
+        plan.seed,
+    )
+    _state_cache.set(
+        edited.digest,
+        (
+            np.concatenate([fitness[:day], tail.fitness]),
+            np.concatenate([fatigue[:day], tail.fatigue]),
+        ),
+    )
+    return edited
+
+
+def plan_hash(df):
+    """계획 DataFrame 내용(열 이름 포함)의 해시. 계획별 파생 결과의 캐시 키로 사용"""
+    import pandas as pd
+
+    digest = hashlib.sha256("\x1f".join(map(str, df.columns)).encode("utf-8"))
+    digest.update(pd.util.hash_pandas_object(df, index=False).to_numpy().tobytes())
+    return digest.hexdigest()
+
+
+def plan_cache_stats():
+    return {
+        "plans": _plan_cache.stats(),
+        "ensembles": _ensemble_cache.stats(),
+        "frames": _frame_cache.stats(),
+        "states": _state_cache.stats(),
+    }
+
+
+def add_performance_levels(df):
+    """예상 퍼포먼스를 10칸 막대(■□)로 정규화한 '퍼포먼스 레벨' 열을 추가한 복사본 반환"""
+    from performanceplan.plan import performance_bars
+
+    df = df.copy()
+    df["퍼포먼스 레벨"] = performance_bars(df["예상 퍼포먼스"].to_numpy())
+    return df
+
+
+def get_intuitive_df_for_csv(df, level_map=LEVEL_LABELS):
+    """CSV 내보내기용으로 강도 설명을 붙이고 열을 정리한 데이터프레임"""
+    df_display = df.copy()
+    df_display["강도 수준"] = df_display["훈련 강도 레벨"].map(level_map)
+    df_display["퍼포먼스 레벨"] = df_display["예상 퍼포먼스"]
+    return df_display[
+        [
+            "날짜",
+            "요일",
+            "단계",
+            "훈련 내용",
+            "강도 수준",
+            "퍼포먼스 레벨",
+            "상세 가이드",
+        ]
+    ]
@@ -0,0 +1,140 @@
+"""
+Prometheus 텍스트 형식 지표 엔드포인트.
+
+metrics 레지스트리의 구간 시간 히스토그램과 누적 횟수, 등록된 수집기의 숫자 값
+(캐시 적중률, 저장소 크기 등)을 /metrics로 제공합니다. 표준 라이브러리 HTTP 서버를
+데몬 스레드에서 실행하므로 Streamlit과 같은 프로세스의 지표를 별도 포트에서 스크랩합니다.
+스크랩할 때만 지표를 만들므로 요청 처리 경로에는 비용이 더해지지 않습니다.
+"""
+
+import http.server
+import logging
+import math
+import re
+import threading
+
+from performanceplan import metrics
+
+logger = logging.getLogger(__name__)
+
+PREFIX = "planner"
+CONTENT_TYPE = "text/plain; version=0.0.4; charset=utf-8"
+
+_INVALID_NAME_CHARS = re.compile(r"[^a-zA-Z0-9_]")
+
+
+def _metric_name(*parts):
+    return _INVALID_NAME_CHARS.sub("_", "_".join(parts)).lower()
+
+
+def _label(value):
+    value = str(value).replace("\\", "\\\\").replace("\n", "\\n")
+    return value.replace('"', '\\"')
+
+
+def _value(number):
+    number = float(number)
+    if math.isnan(number):
+        return "NaN"
+    if math.isinf(number):
+        return "+Inf" if number > 0 else "-Inf"
+    return repr(number) if not number.is_integer() else str(int(number))
+
+
+def _flatten(value, path=()):
+    """중첩 dict의 숫자 값을 (키 경로, 값)으로 나열 (문자열 등은 건너뜀)"""
+    if isinstance(value, dict):
+        for key, item in value.items():
+            yield from _flatten(item, (*path, str(key)))
+    elif isinstance(value, (bool, int, float)):
+        yield path, value
+
+
+def render(registry=None, collected=None):
+    """Prometheus 텍스트 형식 문자열"""
+    registry = registry if registry is not None else metrics.registry
+    collected = collected if collected is not None else metrics.collect()
+    lines = []
+
+    histograms = registry.histograms()
+    if histograms:
+        name = f"{PREFIX}_section_duration_seconds"
+        lines.append(f"# HELP {name} 구간별 소요 시간")
+        lines.append(f"# TYPE {name} histogram")
+        for section, histogram in sorted(histograms.items()):
+            label = f'section="{_label(section)}"'
+            for bound, count in histogram["buckets"]:
+                lines.append(f'{name}_bucket{{{label},le="{bound:g}"}} {count}')
+            lines.append(f'{name}_bucket{{{label},le="+Inf"}} {histogram["count"]}')
+            lines.append(f"{name}_sum{{{label}}} {_value(histogram['sum'])}")
+            lines.append(f"{name}_count{{{label}}} {histogram['count']}")
+
+    counters = registry.counters()
+    if counters:
+        name = f"{PREFIX}_events_total"
+        lines.append(f"# HELP {name} 사건별 누적 횟수")
+        lines.append(f"# TYPE {name} counter")
+        for event, count in sorted(counters.items()):
+            lines.append(f'{name}{{event="{_label(event)}"}} {_value(count)}')
+
+    # 수집기 값은 (수집기 이름 + 마지막 키)를 지표 이름으로, 중간 경로를 key 라벨로 사용
+    gauges = {}
+    for source, stats in sorted(collected.items()):
+        for path, number in _flatten(stats):
+            if not path:
+                continue
+            name = _metric_name(PREFIX, source, path[-1])
+            gauges.setdefault(name, []).append((".".join(path[:-1]), number))
+    for name, samples in sorted(gauges.items()):
+        lines.append(f"# TYPE {name} gauge")
+        for key, number in samples:
+            label = f'{{key="{_label(key)}"}}' if key else ""
+            lines.append(f"{name}{label} {_value(number)}")
+
+    return "\n".join(lines) + "\n"
+
+
+class _MetricsHandler(http.server.BaseHTTPRequestHandler):
+    def do_GET(self):
+        if self.path.split("?", 1)[0] not in ("/", "/metrics"):
+            self.send_error(404)
+            return
+        body = render().encode("utf-8")
+        self.send_response(200)
+        self.send_header("Content-Type", CONTENT_TYPE)
+        self.send_header("Content-Length", str(len(body)))
+        self.end_headers()
+        self.wfile.write(body)
+
+    def log_message(self, format, *args):
+        # 스크랩 요청마다 접근 로그를 남기지 않음
+        logger.debug("metrics: " + format, *args)
+
+
+def start_server(port, address="127.0.0.1"):
+    """데몬 스레드에서 /metrics 서버를 시작하고 서버 객체를 반환 (port=0이면 임의 포트)"""
+    server = http.server.ThreadingHTTPServer((address, port), _MetricsHandler)
+    server.daemon_threads = True
+    thread = threading.Thread(
+        target=server.serve_forever, name="planner-metrics", daemon=True
+    )
+    thread.start()
+    logger.info("지표 엔드포인트: http://%s:%d/metrics", *server.server_address[:2])
+    return server
+
+
+def register_default_collectors():
+    """계획/그래프/내보내기 캐시, 캘린더 렌더링, 가이드 라이브러리 통계를 수집기로 등록"""
+    from performanceplan.charts import chart_cache_stats
+    from performanceplan.export import export_cache_stats
+    from performanceplan.guides import default_library
+    from performanceplan.planner import plan_cache_stats
+    from performanceplan.render import render_stats
+
+    metrics.register_collector("plan_cache", plan_cache_stats)
+    metrics.register_collector("chart_cache", lambda: {"figures": chart_cache_stats()})
+    metrics.register_collector(
+        "export_cache", lambda: {"exports": export_cache_stats()}
+    )
+    metrics.register_collector("calendar", render_stats)
+    metrics.register_collector("guides", lambda: default_library().stats())
@@ -0,0 +1,135 @@
+"""공유 API 클라이언트 풀: 동시 요청 수 제한, 토큰 버킷 RPM/TPM 제한, FIFO 대기열"""
+
+import threading
+import time
+from collections import deque
+from contextlib import contextmanager
+
+
+class TokenBucket:
+    """분당 rate 만큼 채워지는 토큰 버킷 (잠금은 호출 측에서 관리)"""
+
+    def __init__(self, rate, per=60.0, capacity=None):
+        self.rate = rate / per
+        self.capacity = capacity if capacity is not None else rate
+        self.tokens = self.capacity
+        self._updated = time.monotonic()
+
+    def _refill(self):
+        now = time.monotonic()
+        self.tokens = min(
+            self.capacity, self.tokens + (now - self._updated) * self.rate
+        )
+        self._updated = now
+
+    def delay(self, amount):
+        """amount 만큼 꺼내려면 기다려야 하는 시간(초), 0이면 즉시 가능"""
+        self._refill()
+        amount = min(amount, self.capacity)
+        if self.tokens >= amount:
+            return 0.0
+        return (amount - self.tokens) / self.rate
+
+    def take(self, amount):
+        self._refill()
+        self.tokens -= min(amount, self.capacity)
+
+
+class ClientPool:
+    """
+    하나의 클라이언트 인스턴스를 모든 세션이 재사용하도록 하고,
+    동시에 진행되는 요청 수와 분당 요청/토큰 수를 제한합니다.
+    한도를 넘는 요청은 도착 순서대로(FIFO) 대기합니다.
+    """
+
+    def __init__(self, factory, max_in_flight=4, rpm=None, tpm=None):
+        self._factory = factory
+        self._client = None
+        self.max_in_flight = max_in_flight
+        self.rpm = TokenBucket(rpm) if rpm else None
+        self.tpm = TokenBucket(tpm) if tpm else None
+        self._cond = threading.Condition()
+        self._queue = deque()
+        self._in_flight = 0
+        self.completed = 0
+        self.timeouts = 0
+        self.total_wait = 0.0
+
+    @property
+    def client(self):
+        with self._cond:
+            if self._client is None:
+                self._client = self._factory()
+            return self._client
+
+    def _bucket_delay(self, tokens):
+        delay = 0.0
+        if self.rpm is not None:
+            delay = max(delay, self.rpm.delay(1))
+        if self.tpm is not None and tokens:
+            delay = max(delay, self.tpm.delay(tokens))
+        return delay
+
+    @contextmanager
+    def slot(self, tokens=0, on_wait=None, timeout=None):
+        """
+        요청 슬롯을 확보한 뒤 클라이언트를 돌려주는 컨텍스트 매니저.
+        대기 중 순번이 바뀔 때마다 on_wait(순번)을 호출합니다 (1 = 다음 차례).
+        timeout 안에 슬롯을 얻지 못하면 TimeoutError가 발생합니다.
+        """
+        ticket = object()
+        started = time.monotonic()
+        deadline = started + timeout if timeout is not None else None
+        reported = None
+        acquired = False
+        with self._cond:
+            self._queue.append(ticket)
+        try:
+            while True:
+                with self._cond:
+                    position = self._queue.index(ticket) + 1
+                    wait_for = None
+                    if position == 1 and self._in_flight < self.max_in_flight:
+                        wait_for = self._bucket_delay(tokens)
+                        if wait_for <= 0:
+                            if self.rpm is not None:
+                                self.rpm.take(1)
+                            if self.tpm is not None and tokens:
+                                self.tpm.take(tokens)
+                            self._queue.popleft()
+                            self._in_flight += 1
+                            acquired = True
+                            self.total_wait += time.monotonic() - started
+                            self._cond.notify_all()
+                            break
+                    if on_wait is None or position == reported:
+                        if deadline is not None:
+                            remaining = deadline - time.monotonic()
+                            if remaining <= 0:
+                                self.timeouts += 1
+                                raise TimeoutError("API 요청 대기열 시간 초과")
+                            wait_for = min(wait_for or remaining, remaining)
+                        self._cond.wait(wait_for)
+                        continue
+                reported = position
+                on_wait(position)
+
+            yield self.client
+        finally:
+            with self._cond:
+                if acquired:
+                    self._in_flight -= 1
+                    self.completed += 1
+                elif ticket in self._queue:
+                    self._queue.remove(ticket)
+                self._cond.notify_all()
+
+    def stats(self):
+        with self._cond:
+            return {
+                "in_flight": self._in_flight,
+                "queued": len(self._queue),
+                "completed": self.completed,
+                "timeouts": self.timeouts,
+                "avg_wait": self.total_wait / self.completed if self.completed else 0.0,
+            }
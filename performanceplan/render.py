@@ -0,0 +1,157 @@
+"""
+상세 훈련 캘린더 카드 HTML 생성.
+
+카드 템플릿은 모듈 로드 시 한 번만 만들어 두고, 행은 iterrows 없이 열 단위로
+포맷합니다. 스타일은 공용 스타일시트의 짧은 클래스 이름으로 지정하여
+components.html로 전송되는 페이로드를 줄이고, 긴 계획은 page_bounds로 나눈
+기간 단위로만 렌더링합니다.
+"""
+
+import html
+import logging
+import threading
+import time
+from typing import NamedTuple
+
+from performanceplan.metrics import observe
+
+logger = logging.getLogger(__name__)
+
+CALENDAR_CSS = (
+    "<style>"
+    ".cal{display:flex;flex-direction:column;gap:16px;font-family:Helvetica}"
+    ".dh{padding:8px 0;display:flex;gap:8px;font-size:12px;font-weight:700;"
+    "line-height:16px;color:#0D1628}"
+    ".dh b{color:#2BA7D1}"
+    ".c{background:#fff;overflow:hidden;border-radius:16px;"
+    "outline:1px #F1F1F1 solid;display:flex;flex-direction:column}"
+    ".r{padding:12px;display:flex;flex-direction:column;gap:8px}"
+    ".r+.r{border-top:1px #F7F7F7 solid}"
+    ".t{padding-bottom:8px;border-bottom:1px #F1F1F1 solid;display:flex;"
+    "justify-content:space-between;align-items:center;font-weight:700;"
+    "font-size:11px;letter-spacing:.2px;color:#666}"
+    ".t span{font-size:16px;letter-spacing:-1px;vertical-align:middle}"
+    ".t i{font-style:normal;color:#898D99}"
+    ".i0{color:#1AB27A}.i1{color:#EB734D}.i2{color:#FF2B64}"
+    ".g{align-self:flex-start;padding:2px 8px;border-radius:4px;color:#fff;"
+    "font-size:11px;font-weight:700}"
+    ".g0{background:#1AB27A}.g1{background:#EB734D}.g2{background:#86929A}"
+    ".n{color:#0D1628;font-size:16px;font-weight:700;line-height:24px}"
+    ".m{color:#86929A;font-size:12px;font-weight:300;line-height:18px}"
+    "</style>"
+)
+
+# (클래스 번호, 표시 텍스트): 레벨 1-2 / 3-4 / 5 이상
+_INTENSITY = [("0", "매우 낮음"), ("1", "보통"), ("2", "매우 높음")]
+_PHASE_CLASS = {"준비기": "0", "시합기": "1"}
+
+_DAY_TEMPLATE = '<div><div class="dh">{date}<b>{count}건</b></div><div class="c">'
+_ROW_TEMPLATE = (
+    '<div class="r"><div class="t"><div>퍼포먼스: <span>{perf}</span></div>'
+    '<div><i>강도 </i><span class="i{ic}">{it}</span></div></div>'
+    '<div class="g g{pc}">{phase}</div><div class="n">{name}</div>'
+    '<div class="m">{guide}</div></div>'
+).format
+_DAY_END = "</div></div>"
+
+
+class CalendarRender(NamedTuple):
+    html: str
+    seconds: float
+    bytes: int
+
+
+_stats_lock = threading.Lock()
+_stats = {
+    "renders": 0,
+    "seconds": 0.0,
+    "bytes": 0,
+    "last_seconds": 0.0,
+    "last_bytes": 0,
+}
+
+
+def _record(seconds, size):
+    with _stats_lock:
+        _stats["renders"] += 1
+        _stats["seconds"] += seconds
+        _stats["bytes"] += size
+        _stats["last_seconds"] = seconds
+        _stats["last_bytes"] = size
+
+
+def render_stats():
+    """누적 렌더링 횟수, 소요 시간(초), 페이로드 크기(바이트)"""
+    with _stats_lock:
+        return dict(_stats)
+
+
+def _escape(values):
+    return [html.escape(str(v), quote=False) for v in values]
+
+
+def render_calendar(df, level_map=None):
+    """캘린더 HTML과 렌더링 시간, UTF-8 페이로드 크기를 함께 반환"""
+    import numpy as np
+    import pandas as pd
+
+    started = time.perf_counter()
+    # 날짜별 그룹 (날짜 순 정렬, 같은 날짜 안에서는 원래 순서 유지)
+    codes, days = pd.factorize(df["날짜"], sort=True)
+    order = np.argsort(codes, kind="stable")
+    counts = np.bincount(codes, minlength=len(days))
+    day_labels = pd.to_datetime(days).strftime("%y.%m.%d (%a)")
+
+    levels = df["훈련 강도 레벨"].to_numpy()[order]
+    intensity = np.digitize(levels, [3, 5])
+    phases = df["단계"].to_numpy()[order]
+    rows = [
+        _ROW_TEMPLATE(
+            perf=perf,
+            ic=_INTENSITY[i][0],
+            it=_INTENSITY[i][1],
+            pc=_PHASE_CLASS.get(phase, "2"),
+            phase=phase,
+            name=name,
+            guide=guide,
+        )
+        for perf, i, phase, name, guide in zip(
+            df["퍼포먼스 레벨"].to_numpy()[order],
+            intensity,
+            _escape(phases),
+            _escape(df["훈련 내용"].to_numpy()[order]),
+            _escape(df["상세 가이드"].to_numpy()[order]),
+        )
+    ]
+
+    parts = [CALENDAR_CSS, '<div class="cal">']
+    start = 0
+    for label, count in zip(day_labels, counts):
+        parts.append(_DAY_TEMPLATE.format(date=label, count=count))
+        parts.extend(rows[start : start + count])
+        parts.append(_DAY_END)
+        start += count
+    parts.append("</div>")
+    result = "".join(parts)
+
+    seconds = time.perf_counter() - started
+    size = len(result.encode("utf-8"))
+    _record(seconds, size)
+    observe("render.calendar", seconds)
+    logger.debug(
+        "캘린더 렌더링: %d행, %.1fms, %d bytes", len(rows), seconds * 1000, size
+    )
+    return CalendarRender(result, seconds, size)
+
+
+def page_bounds(total_days, page_days):
+    """긴 계획의 캘린더를 page_days일씩 나눈 (시작, 끝) 행 범위 목록"""
+    page_days = max(1, page_days)
+    return [
+        (start, min(start + page_days, total_days))
+        for start in range(0, max(total_days, 1), page_days)
+    ]
+
+
+def generate_calendar_html(df, level_map=None):
+    return render_calendar(df, level_map).html
@@ -0,0 +1,58 @@
+"""동일 키의 동시 호출을 하나의 실행으로 합치는 single-flight 유틸리티"""
+
+import threading
+from concurrent.futures import Future
+
+
+class SingleFlight:
+    """
+    같은 키로 동시에 들어온 호출 중 첫 번째(리더)만 실제 함수를 실행하고,
+    나머지 호출자는 리더의 Future를 기다렸다가 같은 결과나 예외를 받습니다.
+    """
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self._inflight = {}
+        self.calls = 0
+        self.coalesced = 0
+
+    def do(self, key, fn, *args, timeout=None, **kwargs):
+        """
+        fn(*args, **kwargs)를 키 단위로 한 번만 실행합니다.
+        timeout은 대기하는 호출자에게만 적용되며, 초과 시
+        concurrent.futures.TimeoutError가 발생합니다 (진행 중인 호출은 계속됩니다).
+        """
+        with self._lock:
+            future = self._inflight.get(key)
+            leader = future is None
+            if leader:
+                future = Future()
+                self._inflight[key] = future
+                self.calls += 1
+            else:
+                self.coalesced += 1
+
+        if not leader:
+            return future.result(timeout=timeout)
+
+        try:
+            result = fn(*args, **kwargs)
+        except BaseException as e:
+            future.set_exception(e)
+            raise
+        else:
+            future.set_result(result)
+            return result
+        finally:
+            with self._lock:
+                self._inflight.pop(key, None)
+
+    def in_flight(self):
+        return len(self._inflight)
+
+    def stats(self):
+        return {
+            "calls": self.calls,
+            "coalesced": self.coalesced,
+            "in_flight": len(self._inflight),
+        }
@@ -0,0 +1,180 @@
+"""
+생성된 계획을 서버 측에 보관하는 계획 저장소.
+
+세션에는 짧은 계획 ID만 두고, 계획 본문은 SQLite 파일에 저장합니다.
+최근에 사용한 계획은 프로세스 내 LRU(핫 계층)에서 바로 반환하며,
+마지막 사용 후 max_age초가 지난 계획과 전체 크기가 max_bytes를 넘는 만큼의
+오래된 계획은 삭제됩니다. 같은 ID로 다른 세션(공유 URL)에서도 다시 계산 없이 열 수 있습니다.
+"""
+
+import json
+import logging
+import os
+import sqlite3
+import time
+from typing import NamedTuple
+
+from performanceplan.cache import LRUCache, SQLiteTable, make_cache_key
+from performanceplan.plan import Plan
+
+logger = logging.getLogger(__name__)
+
+PLAN_ID_LENGTH = 16
+
+
+class StoredPlan(NamedTuple):
+    plan_id: str
+    plan: Plan
+    goal_name: str
+
+
+class PlanStore:
+    """
+    SQLite 디스크 계층 + 인메모리 LRU 핫 계층. 디스크를 쓸 수 없으면 메모리만 사용.
+    핫 계층에서 반환한 계획도 touch_interval초마다 디스크의 마지막 사용 시각을 갱신하므로
+    계속 쓰이는 계획은 max_age가 지나도 삭제되지 않습니다.
+    """
+
+    def __init__(
+        self,
+        path,
+        memory_entries=256,
+        max_age=7 * 24 * 3600,
+        max_bytes=256 * 1024 * 1024,
+        touch_interval=3600,
+    ):
+        self.path = path
+        self.max_age = max_age
+        self.max_bytes = max_bytes
+        self.touch_interval = touch_interval
+        # 값: (StoredPlan, 디스크 사용 시각을 마지막으로 갱신한 시각)
+        self.memory = LRUCache(max_entries=memory_entries, ttl=max_age or None)
+        self.hits = 0
+        self.misses = 0
+        self.disk_hits = 0
+        self.evictions = 0
+        self._disk = SQLiteTable(
+            path,
+            "plans",
+            "plan_id",
+            "plan_id TEXT PRIMARY KEY, data TEXT NOT NULL, size INTEGER NOT NULL,"
+            " created_at REAL NOT NULL, accessed_at REAL NOT NULL",
+            name="계획 저장소",
+        )
+
+    def put(self, plan, goal_name=""):
+        """계획을 저장하고 계획 ID를 반환 (같은 계획과 목표는 같은 ID)"""
+        plan_id = make_cache_key("plan", plan.digest, goal_name)[:PLAN_ID_LENGTH]
+        now = time.time()
+        self.memory.set(plan_id, (StoredPlan(plan_id, plan, goal_name), now))
+        if not self._disk.available:
+            return plan_id
+        data = json.dumps(
+            {"plan": plan.to_dict(), "goal_name": goal_name}, ensure_ascii=False
+        )
+        try:
+            with self._disk.transaction() as conn:
+                conn.execute(
+                    "INSERT OR REPLACE INTO plans VALUES (?, ?, ?, ?, ?)",
+                    (plan_id, data, len(data.encode("utf-8")), now, now),
+                )
+                # 오래 사용하지 않은 계획과 용량 한도를 넘는 계획을 삭제
+                expired, victims = self._disk.prune(
+                    conn,
+                    "accessed_at",
+                    now - self.max_age if self.max_age else None,
+                    self.max_bytes,
+                    weight="size",
+                )
+            for victim in victims:
+                self.memory.pop(victim)
+            self.evictions += expired + len(victims)
+        except sqlite3.Error as e:
+            logger.warning("계획 저장 실패: %s", e)
+        return plan_id
+
+    def get(self, plan_id):
+        """StoredPlan 또는 (없거나 만료된 경우) None"""
+        entry = self.memory.get(plan_id)
+        if entry is not None:
+            self.hits += 1
+            stored, touched_at = entry
+            now = time.time()
+            if now - touched_at >= self.touch_interval:
+                self._touch(plan_id, now)
+                # 핫 계층 TTL도 마지막 사용 기준으로 다시 계산
+                self.memory.set(plan_id, (stored, now))
+            return stored
+
+        stored = self._disk_get(plan_id)
+        if stored is None:
+            self.misses += 1
+            return None
+        self.hits += 1
+        self.disk_hits += 1
+        self.memory.set(plan_id, (stored, time.time()))
+        return stored
+
+    def _touch(self, plan_id, now):
+        if not self._disk.available:
+            return
+        try:
+            self._disk.touch(plan_id, now)
+        except sqlite3.Error as e:
+            logger.warning("계획 사용 시각 갱신 실패: %s", e)
+
+    def _disk_get(self, plan_id):
+        if not self._disk.available or not plan_id:
+            return None
+        now = time.time()
+        try:
+            with self._disk.transaction() as conn:
+                row = conn.execute(
+                    "SELECT data, accessed_at FROM plans WHERE plan_id = ?",
+                    (plan_id,),
+                ).fetchone()
+                if row is None:
+                    return None
+                if self.max_age and row[1] <= now - self.max_age:
+                    conn.execute("DELETE FROM plans WHERE plan_id = ?", (plan_id,))
+                    self.evictions += 1
+                    return None
+                conn.execute(
+                    "UPDATE plans SET accessed_at = ? WHERE plan_id = ?",
+                    (now, plan_id),
+                )
+            record = json.loads(row[0])
+            return StoredPlan(
+                plan_id, Plan.from_dict(record["plan"]), record["goal_name"]
+            )
+        except (sqlite3.Error, ValueError, KeyError) as e:
+            logger.warning("계획 조회 실패: %s", e)
+            return None
+
+    def stats(self):
+        """저장소 크기와 적중률 게이지"""
+        lookups = self.hits + self.misses
+        entries, size = 0, 0
+        if self._disk.available:
+            entries, size = self._disk.count(weight="size")
+        return {
+            "entries": entries,
+            "bytes": size,
+            "memory_entries": len(self.memory),
+            "hits": self.hits,
+            "misses": self.misses,
+            "disk_hits": self.disk_hits,
+            "evictions": self.evictions,
+            "hit_ratio": self.hits / lookups if lookups else 0.0,
+        }
+
+
+def create_plan_store(cache_dir):
+    """환경 변수 설정으로 앱/도구에서 공유할 계획 저장소 생성"""
+    return PlanStore(
+        os.path.join(cache_dir, "plans.sqlite3"),
+        memory_entries=int(os.getenv("PLANNER_PLAN_STORE_MEMORY", "256")),
+        max_age=float(os.getenv("PLANNER_PLAN_STORE_MAX_AGE", str(7 * 24 * 3600))),
+        max_bytes=int(os.getenv("PLANNER_PLAN_STORE_MAX_BYTES", str(256 * 1024**2))),
+        touch_interval=float(os.getenv("PLANNER_PLAN_STORE_TOUCH_INTERVAL", "3600")),
+    )
@@ -0,0 +1,78 @@
+"""Gemini 스트리밍 응답에서 훈련 객체를 점진적으로 추출하는 파서"""
+
+import json
+
+
+class TrainingStreamParser:
+    """
+    청크 단위로 들어오는 JSON 텍스트를 스캔하여, 배열 안의 객체
+    ({"name": ..., "intensity_level": ...})가 닫히는 즉시 파싱해 돌려줍니다.
+    코드 펜스나 앞뒤 설명 문장은 괄호 밖에 있으므로 무시됩니다.
+    """
+
+    def __init__(self):
+        self.trainings = []
+        self._stack = []
+        self._in_string = False
+        self._escaped = False
+        self._object_start = None
+        self._pos = 0
+        self.text = ""
+
+    def feed(self, chunk):
+        """청크를 추가하고 이번에 완성된 훈련 객체 목록을 반환"""
+        if not chunk:
+            return []
+        self.text += chunk
+        completed = []
+        text = self.text
+        for i in range(self._pos, len(text)):
+            ch = text[i]
+            if self._in_string:
+                if self._escaped:
+                    self._escaped = False
+                elif ch == "\\":
+                    self._escaped = True
+                elif ch == '"':
+                    self._in_string = False
+                continue
+
+            if ch == '"':
+                self._in_string = True
+            elif ch in "{[":
+                if ch == "{" and self._stack and self._stack[-1] == "[":
+                    if self._object_start is None:
+                        self._object_start = (i, len(self._stack))
+                self._stack.append(ch)
+            elif ch in "}]":
+                if self._stack:
+                    self._stack.pop()
+                if (
+                    ch == "}"
+                    and self._object_start is not None
+                    and len(self._stack) == self._object_start[1]
+                ):
+                    item = self._parse_item(text[self._object_start[0] : i + 1])
+                    self._object_start = None
+                    if item is not None:
+                        self.trainings.append(item)
+                        completed.append(item)
+        self._pos = len(text)
+        return completed
+
+    @staticmethod
+    def _parse_item(fragment):
+        try:
+            item = json.loads(fragment)
+        except ValueError:
+            return None
+        if isinstance(item, dict) and "name" in item and "intensity_level" in item:
+            return item
+        return None
+
+
+def iter_trainings(chunks):
+    """텍스트 청크 이터러블에서 완성된 훈련 객체를 순서대로 생성"""
+    parser = TrainingStreamParser()
+    for chunk in chunks:
+        yield from parser.feed(chunk)
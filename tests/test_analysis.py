@@ -0,0 +1,126 @@
+import json
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+from types import SimpleNamespace
+
+import pytest
+
+from performanceplan.analysis import (
+    GENERATION_ALLOWANCE,
+    AnalysisService,
+    TruncatedResponse,
+)
+from performanceplan.cache import PersistentCache
+from performanceplan.ratelimit import ClientPool
+
+RESPONSE = json.dumps(
+    {
+        "trainings": [
+            {"name": "인터벌", "intensity_level": 6},
+            {"name": "이지런", "intensity_level": 4},
+        ]
+    },
+    ensure_ascii=False,
+)
+
+
+class _Model:
+    """text를 chunk_size씩 스트리밍하는 GenerativeModel 대역"""
+
+    def __init__(self, text, finish_reason=None, chunk_size=16):
+        self.text = text
+        self.finish_reason = finish_reason
+        self.chunk_size = chunk_size
+
+    def generate_content(self, prompt, stream=False, **kwargs):
+        candidates = [SimpleNamespace(finish_reason=self.finish_reason)]
+        if not stream:
+            return SimpleNamespace(text=self.text, candidates=candidates)
+        chunks = [
+            self.text[i : i + self.chunk_size]
+            for i in range(0, len(self.text), self.chunk_size)
+        ]
+        return (
+            SimpleNamespace(
+                text=chunk, candidates=candidates if i == len(chunks) - 1 else []
+            )
+            for i, chunk in enumerate(chunks)
+        )
+
+
+def _service(model, tmp_path, streaming=True):
+    cache = PersistentCache(str(tmp_path / "analysis.sqlite3"))
+    return AnalysisService(ClientPool(lambda: model), cache=cache, streaming=streaming)
+
+
+def test_complete_stream_is_cached(tmp_path):
+    service = _service(_Model(RESPONSE, "STOP"), tmp_path)
+    streamed = []
+    trainings = service.analyze("인터벌, 조깅", "마라톤", on_training=streamed.append)
+    assert trainings == streamed == json.loads(RESPONSE)["trainings"]
+    assert service.cache.get(service.cache_key("인터벌, 조깅", "마라톤")) == trainings
+
+
+@pytest.mark.parametrize("streaming", [True, False])
+def test_truncated_stream_is_not_cached(tmp_path, streaming):
+    # 첫 항목은 닫혔지만 두 번째 항목 중간에서 끊긴 응답
+    truncated = RESPONSE[: RESPONSE.index("이지런")]
+    service = _service(_Model(truncated), tmp_path, streaming=streaming)
+    with pytest.raises(ValueError):
+        service.analyze("인터벌, 조깅", "마라톤")
+    assert service.cache.get(service.cache_key("인터벌, 조깅", "마라톤")) is None
+    assert service.usage.stats()["parse_failures"] == 1
+
+
+def test_max_tokens_response_is_rejected(tmp_path):
+    service = _service(_Model(RESPONSE, "MAX_TOKENS"), tmp_path)
+    with pytest.raises(TruncatedResponse):
+        service.analyze("인터벌, 조깅", "마라톤")
+    assert service.cache.get(service.cache_key("인터벌, 조깅", "마라톤")) is None
+    assert service.usage.stats()["parse_failures"] == 1
+
+
+class _BlockingModel:
+    """release가 설정될 때까지 응답하지 않는 모델"""
+
+    def __init__(self):
+        self.release = threading.Event()
+        self.calls = 0
+
+    def generate_content(self, prompt, stream=False, **kwargs):
+        self.calls += 1
+        self.release.wait(5)
+        return SimpleNamespace(text=RESPONSE, candidates=[])
+
+
+def test_waiter_timeout_covers_leader_queue_time():
+    service = AnalysisService(
+        ClientPool(_BlockingModel), wait_timeout=1, queue_timeout=30
+    )
+    assert service.wait_timeout == 30 + GENERATION_ALLOWANCE
+
+
+def test_coalesced_waiter_outlasts_queued_leader():
+    model = _BlockingModel()
+    service = AnalysisService(
+        ClientPool(lambda: model, max_in_flight=1),
+        streaming=False,
+        wait_timeout=0.05,
+        queue_timeout=5,
+    )
+    with ThreadPoolExecutor(max_workers=3) as executor:
+        # 다른 요청이 슬롯을 차지해 리더는 대기열에서 기다림
+        busy = executor.submit(service.analyze, "다른 설명", "마라톤")
+        while model.calls == 0:
+            time.sleep(0.01)
+        leader = executor.submit(service.analyze, "인터벌, 조깅", "마라톤")
+        while service.singleflight.in_flight() < 2:
+            time.sleep(0.01)
+        waiter = executor.submit(service.analyze, "인터벌, 조깅", "마라톤")
+        time.sleep(0.2)  # 지정한 wait_timeout(0.05초)보다 오래 대기열에 머묾
+        model.release.set()
+        expected = json.loads(RESPONSE)["trainings"]
+        assert busy.result() == leader.result() == waiter.result() == expected
+    assert model.calls == 2
+    assert service.singleflight.stats()["coalesced"] == 1
@@ -0,0 +1,66 @@
+import pytest
+
+from performanceplan.analysis import LocalAnalyzer, TieredAnalyzer
+from performanceplan.lexicon import classify
+
+APP_EXAMPLE = (
+    "마라톤 풀코스 준비를 위해 주 4회 훈련합니다. "
+    "인터벌, 지속주, 회복 조깅을 포함하고 싶습니다."
+)
+
+
+class _Fallback:
+    def __init__(self):
+        self.calls = []
+
+    def analyze(self, user_text, goal, on_training=None, on_queue=None):
+        self.calls.append(user_text)
+        return [{"name": "이지런", "intensity_level": 4}]
+
+
+def test_plain_training_list_is_confident():
+    result = classify("인터벌, 지속주, 회복 조깅", "마라톤")
+    assert result.confidence == 1.0
+    assert [t["name"] for t in result.trainings[:3]] == [
+        "인터벌",
+        "템포 지속주",
+        "회복 조깅",
+    ]
+
+
+@pytest.mark.parametrize(
+    "text",
+    [
+        "인터벌은 하지 않고 조깅만",
+        "인터벌 안 하고 조깅",
+        "인터벌 강도를 낮춰서 매일 뛰고 싶어요",
+        "스프린트는 낮게, 조깅 위주",
+        "근력 운동 횟수를 줄여 주세요",
+        "인터벌을 가볍게",
+        "무릎 통증이 있어 점프 없이 조깅",
+    ],
+)
+def test_negation_and_intensity_modifiers_need_context(text):
+    assert classify(text, "마라톤").confidence == 0.0
+
+
+@pytest.mark.parametrize(
+    "text",
+    ["인터벌은 하지 않고 조깅만", "인터벌 강도를 낮춰서 매일 뛰고 싶어요"],
+)
+def test_tiered_analyzer_sends_context_phrases_to_fallback(text):
+    fallback = _Fallback()
+    analyzer = TieredAnalyzer(LocalAnalyzer(), fallback)
+    assert analyzer.analyze(text, "마라톤") == [
+        {"name": "이지런", "intensity_level": 4}
+    ]
+    assert fallback.calls == [text]
+
+
+def test_confidence_at_threshold_uses_fallback():
+    assert classify(APP_EXAMPLE, "마라톤").confidence == 0.75
+    fallback = _Fallback()
+    analyzer = TieredAnalyzer(LocalAnalyzer(), fallback, min_confidence=0.75)
+    analyzer.analyze(APP_EXAMPLE, "마라톤")
+    assert fallback.calls == [APP_EXAMPLE]
+    assert analyzer.local_hits == 0
@@ -0,0 +1,48 @@
+from datetime import date
+
+import pytest
+
+from performanceplan.plan import Plan
+from performanceplan.planner import (
+    edit_plan_day,
+    generate_compact_plan,
+    get_trainings_by_level,
+)
+
+ARRAYS = (
+    "offsets",
+    "levels",
+    "performance",
+    "phase_codes",
+    "training_codes",
+    "guide_codes",
+)
+
+
+@pytest.fixture
+def cached_plan():
+    trainings = get_trainings_by_level([{"name": "인터벌", "intensity_level": 6}])
+    args = (date(2026, 1, 1), date(2026, 2, 1), trainings)
+    plan = generate_compact_plan(*args, seed=11)
+    assert generate_compact_plan(*args, seed=11) is plan
+    return plan
+
+
+@pytest.mark.parametrize("name", ARRAYS)
+def test_cached_plan_arrays_are_read_only(cached_plan, name):
+    with pytest.raises(ValueError):
+        getattr(cached_plan, name)[0] = 1
+
+
+def test_restored_plan_arrays_are_read_only(cached_plan):
+    restored = Plan.from_dict(cached_plan.to_dict())
+    assert restored.digest == cached_plan.digest
+    for name in ARRAYS:
+        assert not getattr(restored, name).flags.writeable
+
+
+def test_edit_does_not_touch_cached_plan(cached_plan):
+    levels = cached_plan.levels.tolist()
+    edited = edit_plan_day(cached_plan, 3, 1)
+    assert edited.levels[3] == 1
+    assert cached_plan.levels.tolist() == levels
@@ -0,0 +1,37 @@
+from datetime import date
+
+from performanceplan.planner import (
+    analyzed_levels,
+    generate_compact_plan,
+    get_trainings_by_level,
+)
+
+START, END = date(2026, 1, 1), date(2026, 3, 1)
+
+TRAINING_LIST = [
+    {"name": "휴식", "intensity_level": 1},
+    {"name": "스트레칭", "intensity_level": 2},
+    {"name": "코어 운동", "intensity_level": 3},
+    {"name": "이지런", "intensity_level": 4},
+    {"name": "인터벌", "intensity_level": 6},
+]
+
+
+def test_analyzed_levels_ignore_filled_defaults():
+    assert analyzed_levels(TRAINING_LIST) == [1, 2, 3, 4, 6]
+    assert analyzed_levels([{"name": "x", "intensity_level": 9}]) == []
+
+
+def test_optimized_plan_uses_only_analyzed_levels():
+    trainings = get_trainings_by_level(TRAINING_LIST)
+    plan = generate_compact_plan(
+        START,
+        END,
+        trainings,
+        seed=7,
+        optimize=True,
+        allowed_levels=analyzed_levels(TRAINING_LIST),
+    )
+    assert set(plan.levels.tolist()) <= set(analyzed_levels(TRAINING_LIST))
+    names = {name for level in (1, 2, 3, 4, 6) for name in trainings[level]}
+    assert {plan.trainings[code] for code in plan.training_codes.tolist()} <= names
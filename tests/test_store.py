@@ -0,0 +1,74 @@
+import time
+from datetime import date
+
+import pytest
+
+from performanceplan.cache import PersistentCache
+from performanceplan.planner import generate_compact_plan, get_trainings_by_level
+from performanceplan.store import PlanStore
+
+
+class _Clock:
+    def __init__(self, now):
+        self.now = now
+
+    def __call__(self):
+        return self.now
+
+
+@pytest.fixture
+def clock(monkeypatch):
+    clock = _Clock(1_000_000.0)
+    monkeypatch.setattr(time, "time", clock)
+    return clock
+
+
+@pytest.fixture
+def plan():
+    trainings = get_trainings_by_level([{"name": "이지런", "intensity_level": 4}])
+    return generate_compact_plan(date(2026, 1, 1), date(2026, 1, 20), trainings, seed=3)
+
+
+def test_memory_hits_keep_plan_alive_on_disk(tmp_path, clock, plan):
+    path = str(tmp_path / "plans.sqlite3")
+    store = PlanStore(path, max_age=100, touch_interval=10)
+    plan_id = store.put(plan, "마라톤")
+
+    clock.now += 50
+    assert store.get(plan_id).plan is plan
+    assert store.disk_hits == 0
+
+    # 처음 저장한 지 max_age가 지났어도 마지막 사용 기준으로는 살아 있음
+    clock.now += 70
+    reopened = PlanStore(path, max_age=100, touch_interval=10)
+    stored = reopened.get(plan_id)
+    assert stored is not None and stored.goal_name == "마라톤"
+    assert reopened.disk_hits == 1
+
+
+def test_unused_plan_expires(tmp_path, clock, plan):
+    path = str(tmp_path / "plans.sqlite3")
+    plan_id = PlanStore(path, max_age=100).put(plan)
+    clock.now += 101
+    store = PlanStore(path, max_age=100)
+    assert store.get(plan_id) is None
+    assert store.stats()["evictions"] == 1
+
+
+def test_plan_store_prunes_by_size(tmp_path, plan):
+    store = PlanStore(str(tmp_path / "plans.sqlite3"), max_bytes=1)
+    first = store.put(plan, "a")
+    store.put(plan, "b")
+    assert store.stats()["entries"] == 0
+    assert store.get(first) is None
+
+
+def test_persistent_cache_prunes_least_recent(tmp_path, clock):
+    cache = PersistentCache(str(tmp_path / "cache.sqlite3"), max_entries=2)
+    for key in ("a", "b", "c"):
+        cache.set(key, {"key": key})
+        clock.now += 1
+    assert cache.stats()["disk_entries"] == 2
+    reopened = PersistentCache(str(tmp_path / "cache.sqlite3"), max_entries=2)
+    assert reopened.get("a") is None
+    assert reopened.get("c") == {"key": "c"}